@@ -647,6 +647,8 @@ def load_canales():
 def save_canales(data):
     with open(CANALES_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
+    # Channel filters decide the weekly lineup; rebuild it now
+    scheduler.wake_scheduler(weekly=True)
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -1396,8 +1398,8 @@ def api_series_time_of_day():
     if not series_name or not time_of_day:
         return jsonify({"error": "Missing series_name or time_of_day"}), 400
 
-    valid_options = ["early_morning", "late_morning", "afternoon", "evening", "night", "any"]
-    if time_of_day not in valid_options:
+    if time_of_day not in scheduler.VALID_TIME_OF_DAY:
+        valid_options = list(scheduler.TIME_OF_DAY_OPTIONS)
         return jsonify({"error": f"Invalid time_of_day. Valid options: {valid_options}"}), 400
 
     series_data = load_series()
@@ -1580,6 +1582,10 @@ def upload_series_post():
     # Save metadata
     save_metadata(metadata)
 
+    # New episodes (or a new series) should reach the schedule now
+    if any(r["ok"] for r in results):
+        scheduler.wake_scheduler(weekly=bool(new_series_name), daily=True)
+
     return jsonify({"ok": True, "results": results})
 
 
@@ -1736,6 +1742,9 @@ def upload_commercials_post():
     # Save metadata
     save_metadata(metadata)
 
+    if any(r["ok"] for r in results):
+        scheduler.wake_scheduler(daily=True)
+
     return jsonify({"ok": True, "results": results})
 
 
@@ -1962,6 +1971,9 @@ def upload_movies_post():
     # Save metadata
     save_metadata(metadata)
 
+    if any(r["ok"] for r in results):
+        scheduler.wake_scheduler(daily=True)
+
     return jsonify({"ok": True, "results": results})
 
 
@@ -2152,6 +2164,9 @@ def api_rebuild_schedule(canal_id):
         scheduler.generate_daily_schedule(channel_id=canal_id)
         logger.info(f"[API] Daily schedule rebuilt for channel: {canal_id}")
 
+        # Let the background loop re-check (and re-time its sleep) right away
+        scheduler.wake_scheduler()
+
         return jsonify({"ok": True, "message": f"Schedule rebuilt successfully for {canal['nombre']}"})
     except Exception as e:
         logger.error(f"[API] Error rebuilding schedule for {canal_id}: {e}")
@@ -3621,7 +3636,7 @@ if __name__ == "__main__":
     # Initialize broadcast TV scheduler
     try:
         scheduler.initialize_scheduler()
-        print("[APP] Broadcast TV scheduler initialized")
+        print("[APP] Broadcast TV scheduler starting in background")
     except Exception as e:
         print(f"[APP] Warning: Could not initialize scheduler: {e}")
 
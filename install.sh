@@ -503,6 +503,7 @@ setup_venv() {
         RPi.GPIO \
         dbus-python \
         python-dotenv \
+        orjson \
         psutil \
         python-uinput \
         nfcpy
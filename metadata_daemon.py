@@ -26,39 +26,66 @@ Runs with low resource priority (nice/ionice) but processes videos continuously
 without throttling between them.
 
 Usage:
-    python3 metadata_daemon.py
+    python3 metadata_daemon.py [--max-workers N]
 
 The daemon will:
 1. Phase 0: Scan directories for new videos (series + commercials)
 2. Phase 1: Process ALL videos for duration and thumbnails (fast)
 3. Phase 2: Process ALL videos for loudness analysis (slow)
 4. Phase 3: Process commercials for channel detection (slow)
-5. Sleep only when all metadata is complete
+5. Sleep only when all metadata is complete, until the library changes (inotify)
 6. Use nice/ionice for low CPU/IO priority
 7. Log all activity to content/logs/metadata_daemon.log
 """
 
+import argparse
+import ctypes
+import functools
 import json
 import logging
+import math
 import os
 import re
+import select
 import signal
+import sqlite3
+import struct
 import subprocess
 import sys
+import threading
 import time
 import fcntl
-from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
 from datetime import datetime
 from pathlib import Path
 
 import channel_detection
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configuration
-CHECK_INTERVAL = 300          # Seconds between scans when all metadata is complete (5 minutes)
+CHECK_INTERVAL = 300          # Longest idle wait without a library change (5 minutes)
 NICE_LEVEL = 19               # Lowest CPU priority (19 = nicest)
 IONICE_CLASS = 2              # Best-effort I/O class
 IONICE_PRIORITY = 7           # Lowest priority within best-effort (0-7)
 FFMPEG_THREADS = 1            # Single-threaded FFmpeg
+# Start of every ffmpeg command: never read stdin (workers run
+# concurrently), and keep stderr down to what we parse - no version banner
+# and no periodic progress line. ebur128 uses framelog=verbose, so its
+# per-frame lines are already below the default log level; only the
+# summary prints, which is why the log level itself stays at info.
+FFMPEG_BASE = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats"]
+# Per-input stream probing limits. Library files are MP4s whose stream
+# parameters come from the container header, so ffmpeg's default 5MB/5s
+# probe before decoding anything is wasted work.
+FFMPEG_INPUT_PROBE = ["-probesize", "1M", "-analyzeduration", "1M"]
+MAX_WORKERS = max(1, (os.cpu_count() or 1) - 1)  # Videos processed in parallel per phase (--max-workers)
+METADATA_FLUSH_EVERY = 50     # Videos per batched metadata.json write during a phase
 
 # Paths
 ROOT_DIR = Path(__file__).parent
@@ -68,6 +95,7 @@ SERIES_VIDEO_DIR = VIDEO_DIR / "series"
 COMMERCIALS_DIR = VIDEO_DIR / "commercials"
 METADATA_FILE = CONTENT_DIR / "metadata.json"
 METADATA_LOCK_FILE = CONTENT_DIR / ".metadata.lock"
+RESULTS_JOURNAL_FILE = CONTENT_DIR / "metadata_results.sqlite"
 SERIES_FILE = CONTENT_DIR / "series.json"
 CANALES_FILE = CONTENT_DIR / "canales.json"
 CHANNEL_CACHE_FILE = CONTENT_DIR / "channel_detection_cache.json"
@@ -77,7 +105,20 @@ LOG_FILE = LOG_DIR / "metadata_daemon.log"
 
 # State
 running = True
+stop_event = threading.Event()  # Set on shutdown to cut idle waits short
+_stop_pipe = os.pipe()          # Written on shutdown to wake the select() in wait_for_changes()
+# Prepended to throttled commands; emptied by lower_process_priority() once
+# the daemon itself (and so every child) runs at low priority
+throttle_prefix = [
+    "nice", "-n", str(NICE_LEVEL),
+    "ionice", "-c", str(IONICE_CLASS), "-n", str(IONICE_PRIORITY),
+]
 logger = None
+_last_scan_signature = None   # Directory/metadata mtimes seen by the last Phase 0 scan
+_metadata_cache = {"data": None, "stat": None}  # Last metadata.json we read or wrote, keyed by (mtime_ns, size)
+_thumbnail_names = set()      # File names in THUMB_DIR as listed...
+_thumbnails_dir_mtime = None  # ...when it had this mtime (any add/delete triggers a relist)
+_work_cache = {}              # find_* function -> (stat keys it was computed for, work list)
 
 
 def setup_logging():
@@ -112,6 +153,65 @@ def setup_logging():
     return logger
 
 
+def json_loads(raw):
+    """Parse UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def json_dumps_indented(data):
+    """Serialize to 2-space-indented UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _acquire_flock_blocking(fd, timeout):
+    """
+    Block in flock() until the lock is free, so we wake as soon as app.py
+    releases it. The timeout is enforced with a SIGALRM timer, which only
+    works on the main thread; elsewhere fall back to polling.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        _acquire_flock_polling(fd, timeout)
+        return
+
+    def on_alarm(signum, frame):
+        raise TimeoutError(f"Could not acquire metadata lock within {timeout}s")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except TimeoutError:
+        # The one-shot alarm can also fire just after flock() returned.
+        # flock locks belong to the open file, so a non-blocking retry
+        # succeeds if the lock is already ours (or was just freed).
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise TimeoutError(f"Could not acquire metadata lock within {timeout}s") from None
+    finally:
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _acquire_flock_polling(fd, timeout):
+    """Poll for the lock with LOCK_NB every 0.1s until timeout."""
+    start = time.monotonic()
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() - start > timeout:
+                raise TimeoutError(f"Could not acquire metadata lock within {timeout}s")
+            time.sleep(0.1)
+
+
 @contextmanager
 def metadata_lock(timeout=30):
     """
@@ -121,15 +221,11 @@ def metadata_lock(timeout=30):
     METADATA_LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
     lock_fd = open(METADATA_LOCK_FILE, 'w')
     try:
-        start = time.time()
-        while True:
-            try:
-                fcntl.flock(lock_fd.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-                break
-            except BlockingIOError:
-                if time.time() - start > timeout:
-                    raise TimeoutError(f"Could not acquire metadata lock within {timeout}s")
-                time.sleep(0.1)
+        try:
+            # Uncontended case: no timer or signal handler needed
+            fcntl.flock(lock_fd.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            _acquire_flock_blocking(lock_fd.fileno(), timeout)
         yield
     finally:
         fcntl.flock(lock_fd.fileno(), fcntl.LOCK_UN)
@@ -139,8 +235,7 @@ def metadata_lock(timeout=30):
 def load_metadata():
     """Load metadata from JSON file."""
     if METADATA_FILE.exists():
-        with open(METADATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_loads(METADATA_FILE.read_bytes())
     return {}
 
 
@@ -153,36 +248,145 @@ def save_metadata_fields(video_id, fields_to_update):
         video_id: The video ID to update
         fields_to_update: Dict of field_name -> value to update
     """
+    flush_metadata_updates({video_id: fields_to_update})
+
+
+def _file_stat_key(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_metadata_snapshot():
+    """
+    Return the daemon's last metadata snapshot, re-reading metadata.json
+    only when it changed on disk since we last read or wrote it.
+    metadata.json is always replaced atomically, so read-only scans don't
+    need the lock; callers must not mutate the result.
+    """
+    stat_key = _file_stat_key(METADATA_FILE)
+    if stat_key is None or stat_key != _metadata_cache["stat"]:
+        _metadata_cache["data"] = load_metadata()
+        _metadata_cache["stat"] = stat_key
+    return _metadata_cache["data"]
+
+
+def load_metadata_locked():
+    """
+    Return metadata for a read-modify-write; call with metadata_lock() held.
+    The returned dict is the shared snapshot (see load_metadata_snapshot()):
+    pass it to write_metadata_locked() after mutating it.
+    """
+    return load_metadata_snapshot()
+
+
+def write_metadata_locked(metadata):
+    """Atomically write metadata.json and remember it as the current snapshot."""
+    try:
+        tmp = METADATA_FILE.with_suffix('.json.tmp')
+        with open(tmp, "wb") as f:
+            f.write(json_dumps_indented(metadata))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, METADATA_FILE)
+    except Exception:
+        # The snapshot may hold edits that never reached disk
+        _metadata_cache["stat"] = None
+        raise
+    _metadata_cache["data"] = metadata
+    _metadata_cache["stat"] = _file_stat_key(METADATA_FILE)
+
+
+def flush_metadata_updates(pending_updates):
+    """
+    Apply field updates for many videos with a single metadata.json rewrite.
+    Takes the lock once and works on fresh data so concurrent app.py edits
+    survive (the file is only re-parsed when someone else changed it).
+    Videos no longer present in metadata are skipped.
+
+    Args:
+        pending_updates: Dict of video_id -> {field_name: value}
+    """
+    if not pending_updates:
+        return
+
     with metadata_lock():
-        # Reload fresh metadata to avoid overwriting changes made by app.py
-        current_metadata = load_metadata()
+        current_metadata = load_metadata_locked()
+
+        changed = False
+        for video_id, fields_to_update in pending_updates.items():
+            if video_id in current_metadata:
+                current_metadata[video_id].update(fields_to_update)
+                changed = True
+
+        if changed:
+            write_metadata_locked(current_metadata)
+
 
-        if video_id in current_metadata:
-            for field, value in fields_to_update.items():
-                current_metadata[video_id][field] = value
+def open_results_journal():
+    """
+    Open the SQLite journal of computed results not yet merged into
+    metadata.json. Each finished video is recorded there immediately (a
+    single-row upsert) so batching metadata.json writes never loses work
+    to a crash or power cut; rows are deleted once flushed.
+    """
+    RESULTS_JOURNAL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(RESULTS_JOURNAL_FILE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pending_updates ("
+        "video_id TEXT PRIMARY KEY, fields TEXT NOT NULL)"
+    )
+    conn.commit()
+    return conn
 
-            # Atomic write
-            tmp = METADATA_FILE.with_suffix('.json.tmp')
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(current_metadata, f, indent=2, ensure_ascii=False)
-                f.flush()
-                os.fsync(f.fileno())
-            os.replace(tmp, METADATA_FILE)
+
+def journal_pending(conn):
+    """Return unflushed results as a dict of video_id -> fields."""
+    rows = conn.execute("SELECT video_id, fields FROM pending_updates").fetchall()
+    return {video_id: json_loads(fields) for video_id, fields in rows}
+
+
+def journal_record(conn, video_id, fields):
+    """Record (replace) the pending fields for one video."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO pending_updates (video_id, fields) VALUES (?, ?)",
+            (video_id, json.dumps(fields)),
+        )
+
+
+def journal_clear(conn, video_ids):
+    """Forget results that have been flushed to metadata.json."""
+    with conn:
+        conn.executemany(
+            "DELETE FROM pending_updates WHERE video_id = ?",
+            ((video_id,) for video_id in video_ids),
+        )
+
+
+def flush_journaled_updates(conn, pending_updates):
+    """Flush pending updates to metadata.json, then drop them from the journal."""
+    flush_metadata_updates(pending_updates)
+    journal_clear(conn, pending_updates)
 
 
 def load_series():
     """Load series data from series.json."""
     if SERIES_FILE.exists():
-        with open(SERIES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_loads(SERIES_FILE.read_bytes())
     return {}
 
 
 def save_series(data):
     """Save series data to series.json with atomic write."""
     tmp = SERIES_FILE.with_suffix('.json.tmp')
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    with open(tmp, "wb") as f:
+        f.write(json_dumps_indented(data))
         f.flush()
         os.fsync(f.fileno())
     os.replace(tmp, SERIES_FILE)
@@ -205,6 +409,14 @@ def parse_episode_info(filename):
     return None, None
 
 
+def iter_video_ids(directory):
+    """Yield the stem of every .mp4 file in directory (non-recursive)."""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".mp4") and entry.is_file():
+                yield entry.name[:-4]
+
+
 def scan_series_directories():
     """
     Phase 0a: Scan series directories for new videos.
@@ -220,12 +432,13 @@ def scan_series_directories():
     new_videos = 0
 
     with metadata_lock():
-        metadata = load_metadata()
+        metadata = load_metadata_locked()
 
         # Scan for series directories
-        for series_dir in SERIES_VIDEO_DIR.iterdir():
-            if not series_dir.is_dir():
-                continue
+        with os.scandir(SERIES_VIDEO_DIR) as it:
+            series_dirs = [entry for entry in it if entry.is_dir()]
+
+        for series_dir in series_dirs:
 
             series_name = series_dir.name
 
@@ -238,8 +451,7 @@ def scan_series_directories():
                 changes_made = True
 
             # Scan for video files in this series
-            for video_file in series_dir.glob("*.mp4"):
-                video_id = video_file.stem  # filename without extension
+            for video_id in iter_video_ids(series_dir.path):
                 series_path = f"series/{series_name}/{video_id}"
 
                 # Check if we already have metadata for this video
@@ -271,12 +483,7 @@ def scan_series_directories():
         # Save changes
         if changes_made:
             # Save metadata with atomic write
-            tmp = METADATA_FILE.with_suffix('.json.tmp')
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-                f.flush()
-                os.fsync(f.fileno())
-            os.replace(tmp, METADATA_FILE)
+            write_metadata_locked(metadata)
 
             save_series(series_data)
 
@@ -297,11 +504,10 @@ def scan_commercials_directory():
     new_videos = 0
 
     with metadata_lock():
-        metadata = load_metadata()
+        metadata = load_metadata_locked()
 
         # Scan for video files in commercials directory
-        for video_file in COMMERCIALS_DIR.glob("*.mp4"):
-            video_id = video_file.stem  # filename without extension
+        for video_id in iter_video_ids(COMMERCIALS_DIR):
             commercials_path = f"commercials/{video_id}"
 
             # Check if we already have metadata for this video
@@ -326,21 +532,47 @@ def scan_commercials_directory():
 
         # Save changes
         if changes_made:
-            tmp = METADATA_FILE.with_suffix('.json.tmp')
-            with open(tmp, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-                f.flush()
-                os.fsync(f.fileno())
-            os.replace(tmp, METADATA_FILE)
+            write_metadata_locked(metadata)
 
     return new_videos
 
 
+def get_scan_signature():
+    """
+    Return the mtimes Phase 0 depends on: the video directories (a directory's
+    mtime changes when entries are added, removed or renamed) plus
+    metadata.json and series.json, so entries removed from those are rediscovered.
+    Missing paths contribute None.
+    """
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    signature = [mtime(SERIES_VIDEO_DIR), mtime(COMMERCIALS_DIR),
+                 mtime(METADATA_FILE), mtime(SERIES_FILE)]
+    try:
+        with os.scandir(SERIES_VIDEO_DIR) as it:
+            signature.extend(sorted((entry.name, entry.stat().st_mtime_ns)
+                                    for entry in it if entry.is_dir()))
+    except OSError:
+        pass
+    return tuple(signature)
+
+
 def scan_all_directories():
     """
     Phase 0: Scan all video directories for new content.
+    Skipped when no directory or metadata file changed since the last scan.
     Returns total number of new videos discovered.
     """
+    global _last_scan_signature
+
+    signature = get_scan_signature()
+    if signature == _last_scan_signature:
+        return 0
+
     logger.info("=" * 50)
     logger.info("PHASE 0: Directory Scan")
     logger.info("=" * 50)
@@ -354,6 +586,9 @@ def scan_all_directories():
     else:
         logger.info("[Phase 0] No new videos discovered")
 
+    # Record the pre-scan signature: files added mid-scan are picked up next
+    # loop (our own writes cost one extra, no-op rescan)
+    _last_scan_signature = signature
     return total
 
 
@@ -367,15 +602,61 @@ def get_video_path(video_id, info):
         return VIDEO_DIR / f"{video_id}.mp4"
 
 
+@functools.lru_cache(maxsize=None)
+def stat_video_file(filepath):
+    """
+    os.stat() a video, or None if it doesn't exist. Memoized for one phase
+    (run_phases clears it) so the existence, mtime and duration-cache checks
+    on a video share a single syscall.
+    """
+    try:
+        return os.stat(filepath)
+    except OSError:
+        return None
+
+
+def lower_process_priority():
+    """
+    Drop this process to NICE_LEVEL CPU and IONICE_CLASS/IONICE_PRIORITY I/O
+    priority. Child processes inherit both, so once this succeeds ffmpeg and
+    ffprobe no longer need to be launched through nice/ionice.
+    Returns True if both priorities were set.
+    """
+    global throttle_prefix
+
+    try:
+        os.setpriority(os.PRIO_PROCESS, 0, NICE_LEVEL)
+    except OSError as e:
+        logger.warning(f"Could not lower CPU priority: {e}")
+        return False
+
+    # ionice applies ioprio_set with the right syscall for the userland ABI
+    # (a 64-bit kernel under a 32-bit Pi OS reports aarch64 but runs armhf)
+    ionice = ["ionice", "-c", str(IONICE_CLASS), "-n", str(IONICE_PRIORITY)]
+    try:
+        result = subprocess.run([*ionice, "-p", str(os.getpid())],
+                                capture_output=True, text=True, timeout=10)
+        failure = result.stderr.strip() if result.returncode != 0 else None
+    except (OSError, subprocess.TimeoutExpired) as e:
+        failure = str(e)
+    if failure is not None:
+        logger.warning(f"Could not lower I/O priority: {failure}")
+        throttle_prefix = ionice
+        return False
+
+    throttle_prefix = []
+    return True
+
+
 def run_throttled(cmd, timeout=600):
     """
-    Run a command with nice/ionice for low resource usage.
+    Run a command at low resource priority. Normally the command just
+    inherits the daemon's lowered priority (see lower_process_priority());
+    throttle_prefix wraps it in ionice only as a fallback when "ionice -p"
+    failed (or in nice/ionice if the priority was never lowered).
     Returns (stdout, stderr, success).
     """
-    throttled_cmd = [
-        "nice", "-n", str(NICE_LEVEL),
-        "ionice", "-c", str(IONICE_CLASS), "-n", str(IONICE_PRIORITY),
-    ] + cmd
+    throttled_cmd = throttle_prefix + cmd
 
     try:
         result = subprocess.run(
@@ -392,118 +673,298 @@ def run_throttled(cmd, timeout=600):
         return "", str(e), False
 
 
-def get_duration(filepath):
-    """Get video duration using ffprobe with throttling."""
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(filepath)
-    ]
+def read_mp4_duration(filepath):
+    """
+    Read an MP4's duration from its moov/mvhd box without spawning ffprobe.
+    Only box headers are read; mdat is skipped with a seek. Returns None if
+    the file isn't a plain MP4 or the header reports no duration (e.g.
+    fragmented MP4), so the caller can fall back to ffprobe.
+    """
+    try:
+        with open(filepath, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.seek(0)
+            moov_end = None
+            while True:
+                box_start = f.tell()
+                limit = moov_end if moov_end is not None else end
+                if box_start + 8 > limit:
+                    return None
+                size, box_type = struct.unpack(">I4s", f.read(8))
+                header = 8
+                if size == 1:
+                    size = struct.unpack(">Q", f.read(8))[0]
+                    header = 16
+                elif size == 0:
+                    size = limit - box_start
+                if size < header:
+                    return None
+
+                if box_type == b"moov" and moov_end is None:
+                    moov_end = box_start + size  # descend into moov
+                    continue
+                if box_type == b"mvhd" and moov_end is not None:
+                    version = f.read(4)[0]
+                    if version == 1:
+                        f.seek(16, os.SEEK_CUR)  # creation + modification time
+                        timescale, duration = struct.unpack(">IQ", f.read(12))
+                    else:
+                        f.seek(8, os.SEEK_CUR)
+                        timescale, duration = struct.unpack(">II", f.read(8))
+                    if timescale == 0 or duration in (0, 0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+                        return None
+                    return duration / timescale
+                f.seek(box_start + size)
+    except (OSError, struct.error, IndexError):
+        return None
 
-    stdout, stderr, success = run_throttled(cmd, timeout=60)
 
-    if success and stdout.strip():
-        try:
-            return float(stdout.strip())
-        except ValueError:
-            pass
+def get_duration(filepath, info=None):
+    """
+    Get video duration from the MP4 header, or with ffprobe (throttled) when
+    the header can't be parsed.
+    If info (the video's metadata) has a duration recorded for the file's
+    current mtime ("file_mtime"), that is returned without probing.
+    """
+    if info and info.get("duracion") and info.get("file_mtime") is not None:
+        st = stat_video_file(filepath)
+        if st is not None and st.st_mtime == info["file_mtime"]:
+            return info["duracion"]
+
+    duration = read_mp4_duration(filepath)
+    if duration is not None:
+        return duration
+
+    # Container headers are enough for well-formed MP4s; retry with a full
+    # probe only if the shallow one can't report a duration
+    for probe_limits in (["-probesize", "32k", "-analyzeduration", "0"], []):
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            *probe_limits,
+            "-show_entries", "format=duration",
+            "-of", "json",
+            str(filepath)
+        ]
+
+        stdout, stderr, success = run_throttled(cmd, timeout=60)
+
+        if success and stdout.strip():
+            try:
+                return float(json_loads(stdout)["format"]["duration"])
+            except (ValueError, KeyError, TypeError):
+                pass
 
     logger.warning(f"Failed to get duration: {stderr}")
     return None
 
 
-def analyze_loudness(filepath, duration=None):
+LOUDNESS_SAMPLE_DURATION = 30   # Seconds per loudness sample
+LOUDNESS_SAMPLE_INTERVAL = 300  # Seconds between sample starts (5 minutes)
+LOUDNESS_WINDOWS_PER_PASS = 6   # Sample windows per ffmpeg run (each is its own input/fd)
+LUFS_ABSOLUTE_GATE = -70.0      # ebur128 ignores audio at or below this
+
+
+def loudness_sample_windows(duration):
+    """
+    Return the (start, end) seconds sampled for loudness on a long file:
+    30 seconds every 5 minutes, plus a final window when more than 10
+    seconds would otherwise go unsampled.
+    """
+    starts = range(0, int(duration - LOUDNESS_SAMPLE_DURATION) + 1, LOUDNESS_SAMPLE_INTERVAL)
+    windows = [(start, start + LOUDNESS_SAMPLE_DURATION) for start in starts]
+
+    next_start = starts[-1] + LOUDNESS_SAMPLE_INTERVAL if starts else 0
+    if duration - next_start > 10:
+        windows.append((max(next_start, duration - LOUDNESS_SAMPLE_DURATION), duration))
+    return windows
+
+
+def build_loudness_args(filepath, windows=None):
+    """
+    Build the ffmpeg arguments for an ebur128 loudness pass over filepath.
+    Each (start, end) window is its own -ss/-t input and the windows are
+    concatenated, so only the sampled seconds are demuxed and decoded.
+    With no windows the whole file is analyzed.
+
+    Returns (input_args, filter_args, timeout); the filtered audio is
+    labeled [loudness] for -map.
+    """
+    if not windows:
+        graph = "[0:a:0]ebur128=framelog=verbose[loudness]"
+        return [*FFMPEG_INPUT_PROBE, "-i", str(filepath)], ["-filter_complex", graph], 600  # 10 min for short files
+
+    input_args = []
+    for start, end in windows:
+        input_args += [*FFMPEG_INPUT_PROBE, "-ss", str(start), "-t", str(end - start), "-i", str(filepath)]
+    labels = "".join(f"[{i}:a:0]" for i in range(len(windows)))
+    graph = f"{labels}concat=n={len(windows)}:v=0:a=1,ebur128=framelog=verbose[loudness]"
+
+    # Timeout based on actual audio to process (samples × duration + overhead)
+    audio_seconds = sum(end - start for start, end in windows)
+    timeout = max(300, audio_seconds * 3)  # 3x realtime + minimum 5 min
+    return input_args, ["-filter_complex", graph], timeout
+
+
+def combine_integrated_loudness(measurements):
+    """
+    Combine (lufs, seconds) results from several loudness passes into one
+    value: the mean of their energies, weighted by the audio each pass
+    measured. Each pass gates its own quiet parts, so this approximates
+    (rather than equals) one ebur128 pass over all the windows; passes
+    that were silent throughout (at the -70 LUFS absolute gate) are left
+    out, as ebur128 would gate them.
+    """
+    measurements = [m for m in measurements if m[0] > LUFS_ABSOLUTE_GATE] or measurements
+    if len(measurements) == 1:
+        return measurements[0][0]
+    total_seconds = sum(seconds for _, seconds in measurements)
+    energy = sum(10 ** (lufs / 10) * seconds for lufs, seconds in measurements)
+    return 10 * math.log10(energy / total_seconds)
+
+
+# Output clause for the [loudness] stream built by build_loudness_args()
+LOUDNESS_OUTPUT_OPTIONS = ["-map", "[loudness]", "-f", "null", "-"]
+
+
+# Integrated loudness line of the ebur128 summary, e.g. "    I:         -23.1 LUFS"
+# (per-frame log lines carry "I:" mid-line, never at the start)
+INTEGRATED_LUFS_RE = re.compile(r"^\s*I:\s+(-?\d+(?:\.\d+)?)\s+LUFS", re.MULTILINE)
+
+
+def parse_integrated_loudness(stderr):
+    """Parse the ebur128 summary's integrated loudness (LUFS) from ffmpeg stderr."""
+    match = INTEGRATED_LUFS_RE.search(stderr)
+    return float(match.group(1)) if match else None
+
+
+def parse_input_duration(stderr):
+    """Parse the first input's "Duration: HH:MM:SS.ss" from ffmpeg stderr."""
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def analyze_loudness(filepath, duration=None, info=None):
     """
     Analyze audio loudness using FFmpeg's ebur128 filter.
-    Samples 30 seconds every 5 minutes for efficiency on long files.
+    Samples 30 seconds every 5 minutes for efficiency on long files. The
+    windows are split over runs of at most LOUDNESS_WINDOWS_PER_PASS
+    inputs, so a long film never holds dozens of file descriptors open,
+    and the runs' results are combined (see combine_integrated_loudness()).
     Returns integrated loudness in LUFS, or None if analysis fails.
+    info is passed to get_duration() when duration isn't given.
     """
-    SAMPLE_DURATION = 30   # seconds per sample
-    SAMPLE_INTERVAL = 300  # seconds between sample starts (5 minutes)
-
     # Get duration if not provided
     if duration is None:
-        duration = get_duration(filepath)
+        duration = get_duration(filepath, info)
 
-    # Build audio filter
-    if duration is None or duration <= SAMPLE_INTERVAL:
+    if duration is None or duration <= LOUDNESS_SAMPLE_INTERVAL:
         # Short file or unknown duration - analyze entire file
-        audio_filter = "ebur128=framelog=verbose"
-        timeout = 600  # 10 min for short files
+        passes = [None]
     else:
-        # Sample 30 seconds every 5 minutes throughout the file
-        samples = []
-        t = 0
-        while t + SAMPLE_DURATION <= duration:
-            samples.append(f"between(t,{t},{t + SAMPLE_DURATION})")
-            t += SAMPLE_INTERVAL
+        windows = loudness_sample_windows(duration)
+        passes = [windows[i:i + LOUDNESS_WINDOWS_PER_PASS]
+                  for i in range(0, len(windows), LOUDNESS_WINDOWS_PER_PASS)]
+        logger.debug(f"Sampling {len(windows)} segments in {len(passes)} passes from {duration:.0f}s file")
 
-        # Add final segment if there's significant time remaining
-        if duration - t > 10:  # More than 10 seconds left
-            end_start = max(t, duration - SAMPLE_DURATION)
-            samples.append(f"between(t,{end_start},{duration})")
+    measurements = []
+    for windows in passes:
+        input_args, filter_args, timeout = build_loudness_args(filepath, windows)
 
-        select_expr = "+".join(samples)
-        # aselect picks the samples, asetpts fixes timestamps for ebur128
-        audio_filter = f"aselect='{select_expr}',asetpts=N/SR/TB,ebur128=framelog=verbose"
+        cmd = [
+            *FFMPEG_BASE,
+            "-threads", str(FFMPEG_THREADS),
+            *input_args,
+            *filter_args,
+            *LOUDNESS_OUTPUT_OPTIONS,
+        ]
 
-        # Timeout based on actual audio to process (samples × duration + overhead)
-        audio_seconds = len(samples) * SAMPLE_DURATION
-        timeout = max(300, audio_seconds * 3)  # 3x realtime + minimum 5 min
+        stdout, stderr, success = run_throttled(cmd, timeout=timeout)
 
-        logger.debug(f"Sampling {len(samples)} segments ({audio_seconds}s total) from {duration:.0f}s file")
+        # Check for timeout
+        if stderr == "Timeout":
+            logger.warning(f"Loudness analysis timed out for {filepath}")
+            return None
 
-    cmd = [
-        "ffmpeg",
-        "-threads", str(FFMPEG_THREADS),
-        "-i", str(filepath),
-        "-af", audio_filter,
-        "-f", "null", "-"
-    ]
+        lufs = parse_integrated_loudness(stderr)
+        if lufs is None:
+            logger.warning(f"Failed to parse loudness from output")
+            return None
+        seconds = sum(end - start for start, end in windows) if windows else 1
+        measurements.append((lufs, seconds))
 
-    stdout, stderr, success = run_throttled(cmd, timeout=timeout)
+    return combine_integrated_loudness(measurements)
 
-    # Check for timeout
-    if stderr == "Timeout":
-        logger.warning(f"Loudness analysis timed out for {filepath}")
-        return None
 
-    # Parse integrated loudness from stderr
-    for line in stderr.split('\n'):
-        line = line.strip()
-        if line.startswith('I:') and 'LUFS' in line:
-            parts = line.split()
-            for i, part in enumerate(parts):
-                if part == 'LUFS' and i > 0:
-                    try:
-                        return float(parts[i-1])
-                    except ValueError:
-                        continue
-
-    logger.warning(f"Failed to parse loudness from output")
-    return None
+# Seek to the keyframe at/before 2s and decode only keyframes, so a
+# thumbnail costs one decoded frame instead of decoding up to the seek point
+THUMBNAIL_INPUT_OPTIONS = [*FFMPEG_INPUT_PROBE, "-noaccurate_seek", "-ss", "00:00:02", "-skip_frame", "nokey"]
+# One scaled frame written to a single image (-update: not an image sequence)
+THUMBNAIL_OUTPUT_OPTIONS = ["-frames:v", "1", "-vf", "scale=320:-1", "-update", "1"]
 
 
 def generate_thumbnail(video_path, thumb_path):
-    """Generate a thumbnail image from a video with throttling."""
+    """
+    Generate a thumbnail image from a video with throttling.
+    Returns (success, duration): the duration comes from ffmpeg's input
+    banner, so a thumbnail run doubles as a probe (None if not reported).
+    """
     cmd = [
-        "ffmpeg",
+        *FFMPEG_BASE,
         "-y",
-        "-ss", "00:00:02",
+        "-threads", str(FFMPEG_THREADS),
+        *THUMBNAIL_INPUT_OPTIONS,
         "-i", str(video_path),
-        "-vframes", "1",
-        "-vf", "scale=320:-1",
+        *THUMBNAIL_OUTPUT_OPTIONS,
+        "-an",
         str(thumb_path)
     ]
 
     stdout, stderr, success = run_throttled(cmd, timeout=60)
 
     if not success:
-        logger.warning(f"Failed to generate thumbnail: {stderr}")
+        # The banner is kept for its Duration: line; the error is at the end
+        error = stderr.strip().splitlines()[-1:] or [""]
+        logger.warning(f"Failed to generate thumbnail: {error[0]}")
+        return False, None
 
-    return success
+    return True, parse_input_duration(stderr)
+
+
+def analyze_all(filepath, need_duration=False, need_lufs=False, thumb_path=None,
+                known_duration=None, info=None):
+    """
+    Collect a video's missing duration, loudness and/or thumbnail with as
+    few ffmpeg/ffprobe runs as possible.
+
+    A thumbnail run also yields the duration (parsed from ffmpeg's input
+    banner), so no separate ffprobe is needed. Loudness sampling needs
+    the duration up front, so get_duration() runs first when it isn't
+    known yet. The phases never ask for a thumbnail and loudness
+    together, so those stay separate ffmpeg runs.
+
+    Returns dict with any of "duracion", "loudness_lufs" and "thumbnail"
+    (True/False), for the outputs that were requested.
+    """
+    results = {}
+    duration = known_duration
+
+    if thumb_path is not None:
+        results["thumbnail"], banner_duration = generate_thumbnail(filepath, thumb_path)
+        if duration is None:
+            duration = banner_duration
+
+    if duration is None and (need_duration or need_lufs):
+        duration = get_duration(filepath, info)
+    if need_duration:
+        results["duracion"] = duration
+    if need_lufs:
+        results["loudness_lufs"] = analyze_loudness(filepath, duration=duration, info=info)
+    return results
 
 
 def find_videos_needing_fast_metadata(metadata):
@@ -512,8 +973,23 @@ def find_videos_needing_fast_metadata(metadata):
     These are fast operations that should complete quickly.
     Returns list of (video_id, info, missing_fields) tuples.
     """
+    global _thumbnails_dir_mtime
+
     needs_work = []
 
+    # One directory listing instead of a stat per video; it is reused
+    # until THUMB_DIR's mtime changes, so an idle rescan costs one stat
+    try:
+        thumb_dir_mtime = os.stat(THUMB_DIR).st_mtime_ns
+    except OSError:
+        thumb_dir_mtime = None
+    if thumb_dir_mtime != _thumbnails_dir_mtime:
+        _thumbnail_names.clear()
+        if thumb_dir_mtime is not None:
+            with os.scandir(THUMB_DIR) as it:
+                _thumbnail_names.update(entry.name for entry in it)
+        _thumbnails_dir_mtime = thumb_dir_mtime
+
     for video_id, info in metadata.items():
         missing = []
 
@@ -522,8 +998,7 @@ def find_videos_needing_fast_metadata(metadata):
             missing.append("duracion")
 
         # Check for missing thumbnail
-        thumb_path = THUMB_DIR / f"{video_id}.jpg"
-        if not thumb_path.exists():
+        if f"{video_id}.jpg" not in _thumbnail_names:
             missing.append("thumbnail")
 
         if missing:
@@ -551,8 +1026,7 @@ def find_videos_needing_loudness(metadata):
 def load_canales():
     """Load channel configurations from canales.json."""
     if CANALES_FILE.exists():
-        with open(CANALES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return json_loads(CANALES_FILE.read_bytes())
     return {}
 
 
@@ -587,6 +1061,33 @@ def find_commercials_needing_channel_detection(metadata):
     return needs_work
 
 
+# Files besides metadata.json each find_* scan reads; their mtimes key find_work_cached()
+WORK_DEPENDENCIES = {
+    find_videos_needing_fast_metadata: (THUMB_DIR,),
+    find_videos_needing_loudness: (),
+    find_commercials_needing_channel_detection: (CANALES_FILE, CHANNEL_CACHE_FILE),
+}
+
+
+def find_work_cached(find_func):
+    """
+    Run a find_* scan over the metadata snapshot, reusing its previous
+    result while metadata.json and the files the scan also reads are
+    unchanged. Writing results changes metadata.json, so processed videos
+    drop out on the next call. Returns the work list.
+    """
+    metadata = load_metadata_snapshot()
+    key = (_metadata_cache["stat"],
+           *(_file_stat_key(path) for path in WORK_DEPENDENCIES[find_func]))
+    cached = _work_cache.get(find_func)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    needs_work = find_func(metadata)
+    _work_cache[find_func] = (key, needs_work)
+    return needs_work
+
+
 def save_channel_match(video_id, channels, evidence, canales):
     """Persist one commercial's match result and log the verdict."""
     save_metadata_fields(video_id, {
@@ -692,6 +1193,26 @@ def run_channel_detection_phase():
     return processed
 
 
+def drop_page_cache(filepath):
+    """
+    Ask the kernel to evict a video's pages from the page cache once we are
+    done with it, so analyzing the library doesn't push out app.py's
+    working set (the videos actually being played). Best effort.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 def process_one_video(video_id, info, missing_fields):
     """
     Process a single video to populate missing metadata.
@@ -699,7 +1220,8 @@ def process_one_video(video_id, info, missing_fields):
     """
     filepath = get_video_path(video_id, info)
 
-    if not filepath.exists():
+    file_stat = stat_video_file(filepath)
+    if file_stat is None:
         logger.warning(f"File not found: {filepath}")
         return {}
 
@@ -709,83 +1231,269 @@ def process_one_video(video_id, info, missing_fields):
     logger.info(f"Processing: {video_id} ({category})")
     logger.info(f"  Missing: {', '.join(missing_fields)}")
 
-    # Get duration if missing
-    if "duracion" in missing_fields:
-        logger.info(f"  Analyzing duration...")
-        duration = get_duration(filepath)
+    need_duration = "duracion" in missing_fields
+    need_lufs = "loudness_lufs" in missing_fields
+    thumb_path = None
+    if "thumbnail" in missing_fields:
+        thumb_path = THUMB_DIR / f"{video_id}.jpg"
+        THUMB_DIR.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"  Analyzing...")
+    results = analyze_all(
+        filepath,
+        need_duration=need_duration,
+        need_lufs=need_lufs,
+        thumb_path=thumb_path,
+        # Pass duration to enable efficient sampling (avoid re-fetching)
+        known_duration=info.get("duracion"),
+        info=info,
+    )
+
+    if need_duration:
+        duration = results.get("duracion")
         if duration is not None:
             updates["duracion"] = duration
+            # Cache key for get_duration(): the duration is valid for this mtime
+            updates["file_mtime"] = file_stat.st_mtime
             logger.info(f"  Duration: {duration:.1f}s")
         else:
             logger.warning(f"  Duration: FAILED")
 
-    # Get loudness if missing
-    if "loudness_lufs" in missing_fields:
-        logger.info(f"  Analyzing loudness...")
-        # Pass duration to enable efficient sampling (avoid re-fetching)
-        known_duration = info.get("duracion") or updates.get("duracion")
-        lufs = analyze_loudness(filepath, duration=known_duration)
+    if need_lufs:
+        lufs = results.get("loudness_lufs")
         if lufs is not None:
             updates["loudness_lufs"] = lufs
             logger.info(f"  Loudness: {lufs:.1f} LUFS")
         else:
             logger.warning(f"  Loudness: FAILED")
 
-    # Generate thumbnail if missing
-    if "thumbnail" in missing_fields:
-        logger.info(f"  Generating thumbnail...")
-        thumb_path = THUMB_DIR / f"{video_id}.jpg"
-        THUMB_DIR.mkdir(parents=True, exist_ok=True)
-        if generate_thumbnail(filepath, thumb_path):
+    drop_page_cache(filepath)
+
+    if thumb_path is not None:
+        # Thumbnail isn't stored in metadata, just the file
+        if results.get("thumbnail"):
             logger.info(f"  Thumbnail: OK")
-            # Thumbnail isn't stored in metadata, just the file
         else:
             logger.warning(f"  Thumbnail: FAILED")
 
     return updates
 
 
-def run_phase(phase_name, find_func):
+def run_phases(phases):
     """
-    Run a single phase of metadata processing.
-    Processes all videos without throttling between them.
+    Run several phases at once, each on its own bounded thread pool, so a
+    slow phase (loudness) doesn't hold back a fast one (thumbnails).
+    The work itself runs in niced ffmpeg children, so threads only wait
+    on subprocesses and share the daemon's caches.
+    Results from all phases are merged per video and flushed together.
+
+    A video an earlier phase is still probing for its duration is queued
+    for loudness only once that probe finishes, with the fresh duration,
+    so a new file isn't read and probed by two phases at the same time.
 
     Args:
-        phase_name: Name of the phase for logging
-        find_func: Function to find videos needing work for this phase
+        phases: List of (phase_name, find_func, max_workers)
 
     Returns:
-        Number of videos processed
+        Dict of phase_name -> number of videos processed
     """
     global running
 
-    metadata = load_metadata()
-    if not metadata:
-        return 0
-
-    needs_work = find_func(metadata)
-    if not needs_work:
-        return 0
+    processed = {phase_name: 0 for phase_name, _, _ in phases}
+
+    # Start the pass with fresh stats; workers share the cache from here
+    stat_video_file.cache_clear()
+
+    if not load_metadata_snapshot():
+        return processed
+
+    journal = open_results_journal()
+    pending_updates = {}
+    with ExitStack() as stack:
+        stack.callback(journal.close)
+        executors = []
+        futures = {}
+        totals = {}
+        probing = set()  # Videos an earlier phase is getting the duration for
+        deferred = {}    # video_id -> (phase_name, executor, info, missing_fields) waiting on that
+        for phase_name, find_func, max_workers in phases:
+            needs_work = find_work_cached(find_func)
+            if not needs_work:
+                continue
 
-    total = len(needs_work)
-    logger.info(f"[{phase_name}] Found {total} videos to process")
+            totals[phase_name] = len(needs_work)
+            logger.info(f"[{phase_name}] Found {len(needs_work)} videos to process ({max_workers} workers)")
+
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+            executors.append(executor)
+            for video_id, info, missing_fields in needs_work:
+                if "duracion" in missing_fields:
+                    probing.add(video_id)
+                elif video_id in probing:
+                    deferred[video_id] = (phase_name, executor, info, missing_fields)
+                    continue
+                future = executor.submit(process_one_video, video_id, info, missing_fields)
+                futures[future] = (phase_name, video_id)
+
+        pending = set(futures)
+        while pending and running:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                phase_name, video_id = futures.pop(future)
+                try:
+                    updates = future.result()
+                except Exception as e:
+                    logger.error(f"[{phase_name}] Failed processing {video_id}: {e}")
+                    updates = {}
+                else:
+                    processed[phase_name] += 1
+                    logger.info(f"[{phase_name}] Finished {processed[phase_name]}/{totals[phase_name]}: {video_id}")
+
+                if video_id in deferred:
+                    # Duration is known now (or failed); the next phase can start
+                    next_phase, executor, info, missing_fields = deferred.pop(video_id)
+                    next_future = executor.submit(process_one_video, video_id,
+                                                  {**info, **updates}, missing_fields)
+                    futures[next_future] = (next_phase, video_id)
+                    pending.add(next_future)
+
+                if updates:
+                    fields = pending_updates.setdefault(video_id, {})
+                    fields.update(updates)
+                    journal_record(journal, video_id, fields)
+                    logger.info(f"[{phase_name}] Updated: {list(updates.keys())}")
+                    if len(pending_updates) >= METADATA_FLUSH_EVERY:
+                        flush_journaled_updates(journal, pending_updates)
+                        pending_updates = {}
 
-    processed = 0
-    for video_id, info, missing_fields in needs_work:
         if not running:
-            break
+            # Drop queued videos; ones already running finish on their own
+            for executor in executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        # Also reached on shutdown, so finished work is never dropped
+        flush_journaled_updates(journal, pending_updates)
+    for phase_name in totals:
+        logger.info(f"[{phase_name}] Complete - processed {processed[phase_name]} videos")
+    return processed
+
+
+def recover_journaled_updates():
+    """Merge results journaled by a previous run that never reached metadata.json."""
+    journal = open_results_journal()
+    try:
+        pending_updates = journal_pending(journal)
+        if pending_updates:
+            logger.info(f"Recovering {len(pending_updates)} journaled results into metadata.json")
+            flush_journaled_updates(journal, pending_updates)
+    finally:
+        journal.close()
+
+
+# inotify(7) through libc. None where unavailable: wait_for_changes() then
+# just sleeps until its timeout
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+    _inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+except (OSError, AttributeError):
+    _inotify_init1 = _inotify_add_watch = None
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+# Entries added, removed or renamed: what a directory's mtime tracks
+INOTIFY_DIR_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+# metadata.json/series.json written in place or atomically replaced
+INOTIFY_CONTENT_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (name follows)
+
+
+def open_library_watch():
+    """
+    Start an inotify watch on what get_scan_signature() covers: the video
+    directories and each series directory, plus CONTENT_DIR for
+    metadata.json and series.json (watched through their directory since
+    they are replaced on write). Directories that don't exist are skipped.
+    Returns (fd, content_wd), or None if inotify isn't available.
+    """
+    if _inotify_init1 is None:
+        return None
+    fd = _inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
 
-        logger.info(f"[{phase_name}] Processing {processed + 1}/{total}: {video_id}")
-        updates = process_one_video(video_id, info, missing_fields)
+    directories = [SERIES_VIDEO_DIR, COMMERCIALS_DIR]
+    try:
+        with os.scandir(SERIES_VIDEO_DIR) as it:
+            directories.extend(entry.path for entry in it if entry.is_dir())
+    except OSError:
+        pass
+    for directory in directories:
+        _inotify_add_watch(fd, os.fsencode(directory), INOTIFY_DIR_EVENTS)
+    content_wd = _inotify_add_watch(fd, os.fsencode(CONTENT_DIR), INOTIFY_CONTENT_EVENTS)
+    return fd, content_wd
 
-        if updates:
-            save_metadata_fields(video_id, updates)
-            logger.info(f"[{phase_name}] Saved: {list(updates.keys())}")
 
-        processed += 1
+def read_library_events(fd, content_wd):
+    """
+    Drain the watch's pending events. Returns True if any of them is a
+    change Phase 0 cares about (CONTENT_DIR events only count for
+    metadata.json and series.json).
+    """
+    watched_names = {os.fsencode(METADATA_FILE.name), os.fsencode(SERIES_FILE.name)}
+    changed = False
+    while True:
+        try:
+            buf = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buf):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(buf, offset)
+            offset += INOTIFY_EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if wd != content_wd or name in watched_names:
+                changed = True
+
+
+def wait_for_changes(timeout):
+    """
+    Idle for up to timeout seconds, waking early when the video directories,
+    metadata.json or series.json change, or on shutdown. The wait blocks
+    in select() on an inotify watch, so an idle library costs no wake-ups;
+    without inotify it is a plain sleep.
+    Returns True if a change was seen.
+    """
+    watch = open_library_watch()
+    if watch is None:
+        stop_event.wait(timeout)
+        return False
 
-    logger.info(f"[{phase_name}] Complete - processed {processed} videos")
-    return processed
+    fd, content_wd = watch
+    try:
+        # Changes made before the watch existed (since the last Phase 0 scan)
+        if get_scan_signature() != _last_scan_signature:
+            return True
+
+        deadline = time.monotonic() + timeout
+        while running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([fd, _stop_pipe[0]], [], [], remaining)
+            if fd in readable and read_library_events(fd, content_wd):
+                logger.info("Change detected, waking up")
+                return True
+        return False
+    finally:
+        os.close(fd)
 
 
 def run_daemon():
@@ -795,6 +1503,7 @@ def run_daemon():
     logger.info("TVArgenta Metadata Daemon starting...")
     logger.info(f"Configuration:")
     logger.info(f"  Check interval (idle): {CHECK_INTERVAL}s")
+    logger.info(f"  Max workers: {MAX_WORKERS} (Phase 1), {max(1, MAX_WORKERS // 2)} (Phase 2)")
     logger.info(f"  Nice level: {NICE_LEVEL}")
     logger.info(f"  I/O class: {IONICE_CLASS} (best-effort), priority: {IONICE_PRIORITY}")
     logger.info(f"  Log file: {LOG_FILE}")
@@ -807,6 +1516,8 @@ def run_daemon():
         logger.warning("Phase 3 disabled: neither whisper-cli nor tesseract found "
                        "(install them to enable commercial channel detection)")
 
+    recover_journaled_updates()
+
     while running:
         try:
             # Phase 0: Scan directories for new videos
@@ -816,43 +1527,42 @@ def run_daemon():
                 break
 
             # Load current metadata (may have been updated by Phase 0)
-            metadata = load_metadata()
+            metadata = load_metadata_snapshot()
 
             if not metadata:
                 logger.info("No videos in metadata, sleeping...")
-                time.sleep(CHECK_INTERVAL)
+                wait_for_changes(CHECK_INTERVAL)
                 continue
 
             # Check if any work is needed
-            fast_work = find_videos_needing_fast_metadata(metadata)
-            loudness_work = find_videos_needing_loudness(metadata)
-            detection_work = find_commercials_needing_channel_detection(metadata)
+            fast_work = find_work_cached(find_videos_needing_fast_metadata)
+            loudness_work = find_work_cached(find_videos_needing_loudness)
+            detection_work = find_work_cached(find_commercials_needing_channel_detection)
 
             if not fast_work and not loudness_work and not detection_work:
-                logger.info(f"All videos have complete metadata, sleeping {CHECK_INTERVAL}s...")
-                time.sleep(CHECK_INTERVAL)
+                logger.info(f"All videos have complete metadata, sleeping up to {CHECK_INTERVAL}s...")
+                wait_for_changes(CHECK_INTERVAL)
                 continue
 
-            # Phase 1: Fast metadata (duration + thumbnails)
-            if fast_work and running:
+            # Phases 1 and 2 run side by side: thumbnails/durations keep
+            # flowing while the slower loudness analysis catches up
+            phases = []
+            if fast_work:
+                phases.append(("Phase 1", find_videos_needing_fast_metadata, MAX_WORKERS))
+            if loudness_work:
+                phases.append(("Phase 2", find_videos_needing_loudness, max(1, MAX_WORKERS // 2)))
+            if phases and running:
                 logger.info("=" * 50)
-                logger.info("PHASE 1: Fast Metadata (duration + thumbnails)")
-                logger.info("=" * 50)
-                run_phase("Phase 1", find_videos_needing_fast_metadata)
-
-            # Phase 2: Loudness analysis
-            if running:
-                # Reload metadata to get fresh state after phase 1
-                loudness_work = find_videos_needing_loudness(load_metadata())
+                if fast_work:
+                    logger.info("PHASE 1: Fast Metadata (duration + thumbnails)")
                 if loudness_work:
-                    logger.info("=" * 50)
                     logger.info("PHASE 2: Loudness Analysis")
-                    logger.info("=" * 50)
-                    run_phase("Phase 2", find_videos_needing_loudness)
+                logger.info("=" * 50)
+                run_phases(phases)
 
             # Phase 3: Channel detection for commercials
             if running:
-                detection_work = find_commercials_needing_channel_detection(load_metadata())
+                detection_work = find_work_cached(find_commercials_needing_channel_detection)
                 if detection_work:
                     logger.info("=" * 50)
                     logger.info("PHASE 3: Channel Detection")
@@ -868,7 +1578,7 @@ def run_daemon():
 
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
-            time.sleep(CHECK_INTERVAL)
+            stop_event.wait(CHECK_INTERVAL)
 
     logger.info("Daemon stopped")
 
@@ -878,13 +1588,26 @@ def signal_handler(signum, frame):
     global running
     logger.info(f"Received signal {signum}, shutting down...")
     running = False
+    stop_event.set()
+    os.write(_stop_pipe[1], b"\0")
 
 
 def main():
     """Entry point."""
+    global MAX_WORKERS
+
+    parser = argparse.ArgumentParser(description="TVArgenta metadata population daemon")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS,
+                        help=f"videos to process in parallel per phase (default: {MAX_WORKERS})")
+    args = parser.parse_args()
+    MAX_WORKERS = max(1, args.max_workers)
+
     # Set up logging first
     setup_logging()
 
+    # Run at low CPU/IO priority; ffmpeg/ffprobe children inherit it
+    lower_process_priority()
+
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -18,16 +18,28 @@ It generates weekly and daily schedules that emulate traditional broadcast telev
 - Episode cursor tracking for chronological progression
 """
 
+import bisect
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import operator
 import os
 import random
 import subprocess
 import threading
-import time
+from array import array
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from settings import (
     CONTENT_DIR, VIDEO_DIR, METADATA_FILE, CANALES_FILE, SERIES_FILE,
@@ -49,10 +61,20 @@ SCHEDULE_META_FILE = CONTENT_DIR / "schedule_meta.json"
 # System video directory (for test pattern, sponsors placeholder)
 SYSTEM_VIDEO_DIR = VIDEO_DIR / "system"
 
-# Test pattern and placeholder videos
-TEST_PATTERN_VIDEO = SYSTEM_VIDEO_DIR / "test_pattern.mp4"
+# Test pattern and placeholder videos. The test pattern is a short clip the
+# player loops; schedule offsets into it wrap at TEST_PATTERN_LOOP_SEC.
+TEST_PATTERN_VIDEO = SYSTEM_VIDEO_DIR / "test_pattern_loop.mp4"
+LEGACY_TEST_PATTERN_VIDEO = SYSTEM_VIDEO_DIR / "test_pattern.mp4"  # old 1-hour render
+TEST_PATTERN_LOOP_SEC = 10
 SPONSORS_PLACEHOLDER_VIDEO = SYSTEM_VIDEO_DIR / "sponsors_placeholder.mp4"
 
+# Start of the system video ffmpeg commands: never read stdin, and only
+# log errors (nothing parses their output)
+FFMPEG_BASE = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y"]
+# Static content: every frame a keyframe (exact, instant seeks to seek_to)
+# and no B-frame/reference search
+SYSTEM_VIDEO_X264 = ["-c:v", "libx264", "-preset", "ultrafast", "-g", "1", "-bf", "0", "-refs", "1"]
+
 # Time-of-day definitions (hour ranges)
 TIME_OF_DAY_RANGES = {
     "early_morning": (4, 7),    # 4am - 7am
@@ -62,6 +84,10 @@ TIME_OF_DAY_RANGES = {
     "night": (21, 27),          # 9pm - 3am (27 = 3am next day)
 }
 
+# Accepted values for a series' time_of_day preference, in display order
+TIME_OF_DAY_OPTIONS = (*TIME_OF_DAY_RANGES, "any")
+VALID_TIME_OF_DAY = frozenset(TIME_OF_DAY_OPTIONS)
+
 # Time-of-day slot counts (30-minute blocks)
 TIME_OF_DAY_SLOTS = {
     "early_morning": 6,   # 4am-7am = 3 hours = 6 slots
@@ -80,6 +106,11 @@ BACK_TO_BACK_WEIGHTS = {
     6: 2,   # 2% chance of 6 episodes
 }
 
+# Cumulative weight table for select_back_to_back_count()
+_BACK_TO_BACK_COUNTS = sorted(BACK_TO_BACK_WEIGHTS)
+_BACK_TO_BACK_CUMULATIVE = list(itertools.accumulate(
+    BACK_TO_BACK_WEIGHTS[count] for count in _BACK_TO_BACK_COUNTS))
+
 # Episode duration thresholds (in seconds)
 VERY_SHORT_EPISODE_MAX = 10 * 60      # < 10 min: 3 episodes per block
 SHORT_EPISODE_MAX = 15 * 60           # 10-15 min: 2 episodes per block
@@ -104,8 +135,9 @@ DAILY_SCHEDULE_MINUTE = 0
 TEST_PATTERN_START_HOUR = 3
 TEST_PATTERN_END_HOUR = 4
 
-# Background loop interval
-SCHEDULER_CHECK_INTERVAL = 5  # seconds
+# Background loop: sleep until the next generation time, but never longer
+# than this (picks up clock/timezone changes and deleted schedule files)
+SCHEDULER_CHECK_INTERVAL = 60  # seconds
 
 # ============================================================================
 # IN-MEMORY SCHEDULE CACHE
@@ -115,37 +147,125 @@ SCHEDULER_CHECK_INTERVAL = 5  # seconds
 _daily_schedule_cache: Optional[dict] = None
 _daily_schedule_cache_lock = threading.Lock()
 
+
+class ScheduleSlot(NamedTuple):
+    """Lookup row for one daily schedule entry, with its player URL resolved."""
+    start: float
+    end: float
+    type: str
+    video_id: str
+    base_timestamp: float
+    video_url: Optional[str]
+
+
+# Parsed JSON files keyed by path: (mtime_ns, size) at parse time, data.
+# Lets the load_* helpers skip re-parsing files that haven't changed.
+_json_cache: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+
+# (metadata dict, index built from it) for get_metadata_index()
+_metadata_index_memo: Tuple[Optional[dict], dict] = (None, {})
+
+# (canales dict, ids of its broadcast channels) for is_broadcast_channel()
+_broadcast_ids_memo: Tuple[Optional[dict], frozenset] = (None, frozenset())
+
+# Per-channel lookup index derived from the cached daily schedule:
+# {channel_id: (slot_starts, slots)}. Rebuilt whenever the cache is replaced.
+# slot_starts is a packed array('d') of sorted start seconds for bisect.
+_daily_schedule_index: Dict[str, Tuple[array, List[ScheduleSlot]]] = {}
+
+# Serializes schedule generation between the background loop and app.py's
+# per-channel rebuilds (both read-modify-write the schedule and cursor files)
+_generation_lock = threading.Lock()
+
+
+def _serialized_generation(func):
+    """Run a schedule generator while holding _generation_lock."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _generation_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
 # ============================================================================
 # DATA LOADING UTILITIES
 # ============================================================================
 
-def _write_json_atomic(path: Path, data: dict) -> None:
-    """Write JSON data atomically to prevent corruption."""
+def _json_dumps(data: dict, indent: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _read_json(path: Path) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _read_json_cached(path: Path) -> Any:
+    """
+    Read and parse a JSON file, reusing the previous parse while the file's
+    (mtime_ns, size) is unchanged. The result is shared between callers:
+    copy it before mutating.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    data = _read_json(path)
+    _json_cache[path] = (key, data)
+    return data
+
+
+def _write_json_atomic(path: Path, data: dict, indent: bool = True) -> None:
+    """
+    Write JSON data atomically to prevent corruption.
+    Generated schedules pass indent=False: they are large, rewritten by the
+    scheduler thread and never edited by hand.
+    """
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.flush()
-        os.fsync(f.fileno())
+    # Serialized once, then written straight to the fd (no buffered file layer)
+    buf = memoryview(_json_dumps(data, indent))
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        while buf:
+            buf = buf[os.write(fd, buf):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
     os.replace(tmp, path)
+    _json_cache.pop(path, None)
 
 
 def load_metadata() -> dict:
-    """Load video metadata from metadata.json."""
+    """Load video metadata from metadata.json (shared; don't mutate)."""
     try:
         if METADATA_FILE.exists():
-            with open(METADATA_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json_cached(METADATA_FILE)
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading metadata.json: {e}")
     return {}
 
 
 def load_series() -> dict:
-    """Load series data from series.json."""
+    """Load series data from series.json (shared; don't mutate)."""
     try:
         if SERIES_FILE.exists():
-            with open(SERIES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json_cached(SERIES_FILE)
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading series.json: {e}")
     return {}
@@ -157,22 +277,26 @@ def save_series(data: dict) -> None:
 
 
 def load_canales() -> dict:
-    """Load channel configurations from canales.json."""
+    """Load channel configurations from canales.json (shared; don't mutate)."""
     try:
         if CANALES_FILE.exists():
-            with open(CANALES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json_cached(CANALES_FILE)
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading canales.json: {e}")
     return {}
 
 
+def get_broadcast_channels(canales: dict) -> List[Tuple[str, dict]]:
+    """Return (channel_id, config) pairs for channels with a series_filter."""
+    return [(cid, config) for cid, config in canales.items()
+            if config.get("series_filter")]
+
+
 def load_weekly_schedule() -> dict:
-    """Load weekly schedule from file."""
+    """Load weekly schedule from file (shared; don't mutate)."""
     try:
         if WEEKLY_SCHEDULE_FILE.exists():
-            with open(WEEKLY_SCHEDULE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _read_json_cached(WEEKLY_SCHEDULE_FILE)
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading weekly_schedule.json: {e}")
     return {}
@@ -180,12 +304,39 @@ def load_weekly_schedule() -> dict:
 
 def save_weekly_schedule(data: dict) -> None:
     """Save weekly schedule to file."""
-    _write_json_atomic(WEEKLY_SCHEDULE_FILE, data)
+    _write_json_atomic(WEEKLY_SCHEDULE_FILE, data, indent=False)
+
+
+def _build_schedule_index(schedule: dict) -> Dict[str, Tuple[array, List[ScheduleSlot]]]:
+    """
+    Build per-channel sorted start arrays so lookups can bisect instead of
+    scanning every entry. Where entries overlap, the earlier entry in the
+    list keeps the overlapping range (same result as a first-match scan).
+    """
+    index = {}
+    for cid, entries in schedule.get("channels", {}).items():
+        starts = []
+        kept = []
+        covered_until = None
+        for entry in entries:
+            start = entry["start"]
+            if covered_until is not None and start < covered_until:
+                if entry["end"] <= covered_until:
+                    continue  # fully shadowed by earlier entries
+                start = covered_until
+            starts.append(start)
+            kept.append(ScheduleSlot(
+                entry["start"], entry["end"], entry["type"], entry["video_id"],
+                entry.get("base_timestamp", 0), _entry_video_url(entry)))
+            covered_until = entry["end"] if covered_until is None else max(covered_until, entry["end"])
+        order = sorted(range(len(starts)), key=starts.__getitem__)
+        index[cid] = (array("d", [starts[i] for i in order]), [kept[i] for i in order])
+    return index
 
 
 def load_daily_schedule() -> dict:
     """Load daily schedule from cache, falling back to file on cold start."""
-    global _daily_schedule_cache
+    global _daily_schedule_cache, _daily_schedule_index
 
     with _daily_schedule_cache_lock:
         # Return cached version if available
@@ -195,24 +346,36 @@ def load_daily_schedule() -> dict:
         # Cold start: load from disk and populate cache
         try:
             if DAILY_SCHEDULE_FILE.exists():
-                with open(DAILY_SCHEDULE_FILE, "r", encoding="utf-8") as f:
-                    _daily_schedule_cache = json.load(f)
-                    return _daily_schedule_cache
+                _daily_schedule_cache = _read_json(DAILY_SCHEDULE_FILE)
+                _daily_schedule_index = _build_schedule_index(_daily_schedule_cache)
+                return _daily_schedule_cache
         except Exception as e:
             logger.error(f"[SCHEDULER] Error loading daily_schedule.json: {e}")
 
         return {}
 
 
-def save_daily_schedule(data: dict) -> None:
-    """Save daily schedule to file and update cache."""
-    global _daily_schedule_cache
+def save_daily_schedule(data: dict, channel_id: str = None) -> None:
+    """
+    Save daily schedule to file and update cache.
+    Pass channel_id when only that channel changed: the other channels
+    keep their existing lookup index instead of being re-indexed.
+    """
+    global _daily_schedule_cache, _daily_schedule_index
 
-    _write_json_atomic(DAILY_SCHEDULE_FILE, data)
+    _write_json_atomic(DAILY_SCHEDULE_FILE, data, indent=False)
+    if channel_id is None:
+        index = _build_schedule_index(data)
+    else:
+        with _daily_schedule_cache_lock:
+            index = dict(_daily_schedule_index)
+        index.update(_build_schedule_index(
+            {"channels": {channel_id: data.get("channels", {}).get(channel_id, [])}}))
 
     # Update the in-memory cache (replaces previous day's cache)
     with _daily_schedule_cache_lock:
         _daily_schedule_cache = data
+        _daily_schedule_index = index
 
     logger.info("[SCHEDULER] Daily schedule cache updated")
 
@@ -223,7 +386,7 @@ def warm_daily_schedule_cache() -> bool:
     Call this during initialization to avoid disk I/O on first channel switch.
     Returns True if cache was warmed, False if no schedule exists.
     """
-    global _daily_schedule_cache
+    global _daily_schedule_cache, _daily_schedule_index
 
     with _daily_schedule_cache_lock:
         # Already cached
@@ -233,8 +396,8 @@ def warm_daily_schedule_cache() -> bool:
         # Load from disk
         try:
             if DAILY_SCHEDULE_FILE.exists():
-                with open(DAILY_SCHEDULE_FILE, "r", encoding="utf-8") as f:
-                    _daily_schedule_cache = json.load(f)
+                _daily_schedule_cache = _read_json(DAILY_SCHEDULE_FILE)
+                _daily_schedule_index = _build_schedule_index(_daily_schedule_cache)
                 logger.info("[SCHEDULER] Daily schedule cache warmed from disk")
                 return True
         except Exception as e:
@@ -244,11 +407,14 @@ def warm_daily_schedule_cache() -> bool:
 
 
 def load_episode_cursors() -> dict:
-    """Load episode cursor positions from file."""
+    """
+    Load episode cursor positions from file.
+    Returns a copy callers may update: cursors[channel][series] = {...}.
+    """
     try:
         if EPISODE_CURSORS_FILE.exists():
-            with open(EPISODE_CURSORS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            cursors = _read_json_cached(EPISODE_CURSORS_FILE)
+            return {cid: dict(series) for cid, series in cursors.items()}
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading episode_cursors.json: {e}")
     return {}
@@ -259,19 +425,38 @@ def save_episode_cursors(data: dict) -> None:
     _write_json_atomic(EPISODE_CURSORS_FILE, data)
 
 
+@contextmanager
+def cursor_batch():
+    """
+    Load episode cursors once and save them once on exit.
+
+    For ad-hoc callers advancing several cursors: pass the yielded dict as
+    `cursors=` so each advance skips its own load/save round-trip. Nothing
+    is written if the block raises.
+    """
+    cursors = load_episode_cursors()
+    yield cursors
+    save_episode_cursors(cursors)
+
+
 def load_schedule_meta() -> dict:
-    """Load schedule generation metadata."""
+    """Load schedule generation metadata (a copy callers may update)."""
     try:
         if SCHEDULE_META_FILE.exists():
-            with open(SCHEDULE_META_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return dict(_read_json_cached(SCHEDULE_META_FILE))
     except Exception as e:
         logger.error(f"[SCHEDULER] Error loading schedule_meta.json: {e}")
     return {}
 
 
 def save_schedule_meta(data: dict) -> None:
-    """Save schedule generation metadata."""
+    """
+    Save schedule generation metadata.
+    Skipped when the file already holds the same content (checked against
+    the cached parse), sparing the SD card a rewrite and fsync.
+    """
+    if data == load_schedule_meta():
+        return
     _write_json_atomic(SCHEDULE_META_FILE, data)
 
 
@@ -288,57 +473,40 @@ def get_series_time_of_day(series_name: str) -> str:
 
 def set_series_time_of_day(series_name: str, time_of_day: str) -> bool:
     """Set the time-of-day preference for a series."""
-    valid_options = list(TIME_OF_DAY_RANGES.keys()) + ["any"]
-    if time_of_day not in valid_options:
+    if time_of_day not in VALID_TIME_OF_DAY:
         logger.error(f"[SCHEDULER] Invalid time_of_day: {time_of_day}")
         return False
 
-    series_data = load_series()
+    series_data = dict(load_series())
     if series_name not in series_data:
         logger.error(f"[SCHEDULER] Series not found: {series_name}")
         return False
 
-    series_data[series_name]["time_of_day"] = time_of_day
+    series_data[series_name] = {**series_data[series_name], "time_of_day": time_of_day}
     save_series(series_data)
     logger.info(f"[SCHEDULER] Set time_of_day for {series_name} to {time_of_day}")
     return True
 
 
-def get_series_episodes(series_name: str, metadata: dict = None) -> List[dict]:
+def build_metadata_index(metadata: dict) -> dict:
     """
-    Get all episodes for a series, sorted chronologically.
-    Returns list of dicts with video_id, season, episode, duration, series_path.
+    Split metadata into the views schedule generation needs, in one pass:
+    {"episodes_by_series": {series: [episode, ...]}, "commercials": [...]}.
+    Episode lists are sorted chronologically (by season, then episode).
     """
-    if metadata is None:
-        metadata = load_metadata()
-
-    episodes = []
+    by_series: Dict[str, List[dict]] = {}
+    commercials = []
     for video_id, data in metadata.items():
-        if data.get("category") == "tv_episode" and data.get("series") == series_name:
-            episodes.append({
+        category = data.get("category")
+        if category == "tv_episode":
+            by_series.setdefault(data.get("series"), []).append({
                 "video_id": video_id,
                 "season": data.get("season") or 1,
                 "episode": data.get("episode") or 1,
                 "duration": data.get("duracion") or 0,
                 "series_path": data.get("series_path"),
             })
-
-    # Sort chronologically: by season, then by episode
-    episodes.sort(key=lambda e: (e["season"], e["episode"]))
-    return episodes
-
-
-def get_commercials(metadata: dict = None) -> List[dict]:
-    """
-    Get all commercial videos from metadata.
-    Returns list of dicts with video_id and duration.
-    """
-    if metadata is None:
-        metadata = load_metadata()
-
-    commercials = []
-    for video_id, data in metadata.items():
-        if data.get("category") == "commercial":
+        elif category == "commercial":
             # A human-set "channels" key (even []) overrides auto-detection;
             # otherwise fall back to daemon-detected channels. Empty = all.
             if "channels" in data:
@@ -351,7 +519,53 @@ def get_commercials(metadata: dict = None) -> List[dict]:
                 "channels": channels,  # empty = all channels
             })
 
-    return commercials
+    # Sort chronologically: by season, then by episode
+    chronological = operator.itemgetter("season", "episode")
+    for episodes in by_series.values():
+        episodes.sort(key=chronological)
+    return {"episodes_by_series": by_series, "commercials": commercials}
+
+
+def get_metadata_index(metadata: dict = None) -> dict:
+    """
+    Return build_metadata_index() for metadata (default: metadata.json),
+    reusing the last index while the same metadata dict is passed in.
+    load_metadata() hands out one shared dict per file version, so the
+    index is rebuilt only when metadata.json changes. Shared; don't mutate.
+    """
+    global _metadata_index_memo
+
+    if metadata is None:
+        metadata = load_metadata()
+    source, index = _metadata_index_memo
+    if source is not metadata:
+        index = build_metadata_index(metadata)
+        _metadata_index_memo = (metadata, index)
+    return index
+
+
+def get_episodes_by_series(metadata: dict = None) -> Dict[str, List[dict]]:
+    """
+    Group all TV episodes by series (shared; don't mutate).
+    Each list is sorted chronologically, as returned by get_series_episodes().
+    """
+    return get_metadata_index(metadata)["episodes_by_series"]
+
+
+def get_series_episodes(series_name: str, metadata: dict = None) -> List[dict]:
+    """
+    Get all episodes for a series, sorted chronologically.
+    Returns list of dicts with video_id, season, episode, duration, series_path.
+    """
+    return get_episodes_by_series(metadata).get(series_name, [])
+
+
+def get_commercials(metadata: dict = None) -> List[dict]:
+    """
+    Get all commercial videos from metadata (shared; don't mutate).
+    Returns list of dicts with video_id, duration and channels.
+    """
+    return get_metadata_index(metadata)["commercials"]
 
 
 def filter_commercials_for_channel(commercials: List[dict], channel_id: str) -> List[dict]:
@@ -368,15 +582,60 @@ def filter_commercials_for_channel(commercials: List[dict], channel_id: str) ->
 # SYSTEM VIDEO GENERATION
 # ============================================================================
 
+def _system_video_hash_file(path: Path) -> Path:
+    """Sidecar holding the SHA-256 of a generated system video."""
+    return path.with_name(path.name + ".sha256")
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def record_system_video_hash(path: Path) -> None:
+    """Record a system video's hash so later startups can verify it."""
+    _system_video_hash_file(path).write_text(_file_sha256(path) + "\n")
+
+
+def system_video_intact(path: Path) -> bool:
+    """
+    True if a system video exists and matches its recorded hash.
+    Videos generated before hashes were recorded are trusted once and
+    get a sidecar.
+    """
+    if not path.exists():
+        return False
+    try:
+        expected = _system_video_hash_file(path).read_text().strip()
+    except FileNotFoundError:
+        record_system_video_hash(path)
+        return True
+    if _file_sha256(path) != expected:
+        logger.warning(f"[SCHEDULER] {path.name} does not match its recorded hash")
+        return False
+    return True
+
+
 def ensure_system_videos_exist() -> None:
-    """Ensure test pattern and sponsors placeholder videos exist."""
+    """Ensure test pattern and sponsors placeholder videos exist and are intact."""
     SYSTEM_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
 
-    if not TEST_PATTERN_VIDEO.exists():
+    if not system_video_intact(TEST_PATTERN_VIDEO):
         logger.info("[SCHEDULER] Generating test pattern video...")
         generate_test_pattern_video()
 
-    if not SPONSORS_PLACEHOLDER_VIDEO.exists():
+    # The looping clip replaces the old 1-hour render; reclaim its space
+    if LEGACY_TEST_PATTERN_VIDEO != TEST_PATTERN_VIDEO and LEGACY_TEST_PATTERN_VIDEO.exists():
+        try:
+            LEGACY_TEST_PATTERN_VIDEO.unlink()
+            logger.info("[SCHEDULER] Removed old 1-hour test pattern video")
+        except OSError as e:
+            logger.warning(f"[SCHEDULER] Could not remove old test pattern video: {e}")
+
+    if not system_video_intact(SPONSORS_PLACEHOLDER_VIDEO):
         logger.info("[SCHEDULER] Generating sponsors placeholder video...")
         generate_sponsors_placeholder_video()
 
@@ -384,49 +643,30 @@ def ensure_system_videos_exist() -> None:
 def generate_test_pattern_video() -> bool:
     """
     Generate SMPTE color bars test pattern video with 1kHz tone.
-    Creates a 1-hour video for looping during 3am-4am.
+    Creates a short clip the player loops for as long as the test pattern
+    is scheduled (3am-4am, and any unfilled blocks).
     """
     try:
         SYSTEM_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
 
-        # Download SMPTE color bars image
-        smpte_url = "https://upload.wikimedia.org/wikipedia/commons/thumb/6/66/SMPTE_Color_Bars.svg/960px-SMPTE_Color_Bars.svg.png"
-        smpte_image = SYSTEM_VIDEO_DIR / "smpte_bars.png"
-
-        # Use wget or curl to download
-        try:
-            subprocess.run([
-                "wget", "-q", "-O", str(smpte_image), smpte_url
-            ], check=True, timeout=30)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # Try curl as fallback
-            subprocess.run([
-                "curl", "-s", "-o", str(smpte_image), "-L", smpte_url
-            ], check=True, timeout=30)
-
-        if not smpte_image.exists():
-            logger.error("[SCHEDULER] Failed to download SMPTE bars image")
-            return False
-
-        # Generate 1-hour test pattern video with 1kHz tone
-        # Using ffmpeg to create video from image + generate tone
+        # Generate the looping test pattern clip: ffmpeg's built-in SMPTE
+        # bars source plus a 1kHz tone (no image download needed)
         subprocess.run([
-            "ffmpeg", "-y",
-            "-loop", "1",
-            "-i", str(smpte_image),
+            *FFMPEG_BASE,
+            "-f", "lavfi",
+            "-i", "smptebars=size=960x540:rate=30",
             "-f", "lavfi",
             "-i", "sine=frequency=1000:sample_rate=48000",
-            "-c:v", "libx264",
-            "-preset", "ultrafast",
+            *SYSTEM_VIDEO_X264,
             "-tune", "stillimage",
             "-c:a", "aac",
             "-b:a", "128k",
             "-pix_fmt", "yuv420p",
-            "-t", "3600",  # 1 hour
-            "-shortest",
+            "-t", str(TEST_PATTERN_LOOP_SEC),
             str(TEST_PATTERN_VIDEO)
-        ], check=True, timeout=600)
+        ], check=True, timeout=60)
 
+        record_system_video_hash(TEST_PATTERN_VIDEO)
         logger.info(f"[SCHEDULER] Test pattern video created: {TEST_PATTERN_VIDEO}")
         return True
 
@@ -447,20 +687,20 @@ def generate_sponsors_placeholder_video() -> bool:
         text = "Your scheduled programming\\nwill resume after a word\\nfrom our sponsors"
 
         subprocess.run([
-            "ffmpeg", "-y",
+            *FFMPEG_BASE,
             "-f", "lavfi",
             "-i", "color=c=0x000088:s=960x540:d=30",
             "-f", "lavfi",
             "-i", "anullsrc=r=48000:cl=stereo",
             "-vf", f"drawtext=text='{text}':fontsize=36:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2:font=monospace",
-            "-c:v", "libx264",
-            "-preset", "ultrafast",
+            *SYSTEM_VIDEO_X264,
             "-c:a", "aac",
             "-t", "30",
             "-pix_fmt", "yuv420p",
             str(SPONSORS_PLACEHOLDER_VIDEO)
         ], check=True, timeout=60)
 
+        record_system_video_hash(SPONSORS_PLACEHOLDER_VIDEO)
         logger.info(f"[SCHEDULER] Sponsors placeholder video created: {SPONSORS_PLACEHOLDER_VIDEO}")
         return True
 
@@ -474,47 +714,27 @@ def generate_sponsors_placeholder_video() -> bool:
 # ============================================================================
 
 def get_next_episode_for_channel(channel_id: str, series_name: str,
-                                  cursors: dict = None, metadata: dict = None) -> Optional[dict]:
+                                  cursors: dict = None, metadata: dict = None,
+                                  episodes: List[dict] = None) -> Optional[dict]:
     """
     Get the next episode to play for a given channel and series.
     Advances cursor position and handles wrap-around.
     Returns episode dict or None if no episodes available.
+    Pass `episodes` (the series' sorted episode list) to skip the metadata scan.
     """
     # Track if we need to save cursors (when loaded internally)
     should_save_cursors = cursors is None
 
     if cursors is None:
         cursors = load_episode_cursors()
-    if metadata is None:
-        metadata = load_metadata()
-
-    episodes = get_series_episodes(series_name, metadata)
+    if episodes is None:
+        episodes = get_series_episodes(series_name, metadata)
     if not episodes:
         logger.warning(f"[SCHEDULER] No episodes found for series: {series_name}")
         return None
 
-    # Get current cursor position for this channel+series
-    channel_cursors = cursors.get(channel_id, {})
-    series_cursor = channel_cursors.get(series_name, {
-        "season": 1,
-        "episode": 0,  # Will advance to 1 on first call
-        "last_index": -1
-    })
-
-    current_index = series_cursor.get("last_index", -1)
-    next_index = (current_index + 1) % len(episodes)
-
-    next_episode = episodes[next_index]
-
-    # Update cursor
-    if channel_id not in cursors:
-        cursors[channel_id] = {}
-    cursors[channel_id][series_name] = {
-        "season": next_episode["season"],
-        "episode": next_episode["episode"],
-        "last_index": next_index,
-        "updated_at": app_now().isoformat()
-    }
+    next_episode = advance_episodes_for_channel(channel_id, series_name, 1,
+                                                cursors, episodes)[0]
 
     # Save cursors if we loaded them internally
     if should_save_cursors:
@@ -523,19 +743,51 @@ def get_next_episode_for_channel(channel_id: str, series_name: str,
     return next_episode
 
 
+def advance_episodes_for_channel(channel_id: str, series_name: str, count: int,
+                                 cursors: dict, episodes: List[dict],
+                                 now_iso: str = None) -> List[dict]:
+    """
+    Advance a channel's cursor for a series by `count` episodes in one step.
+    Returns the episodes advanced over, in play order, wrapping around the
+    end of the series. `episodes` is the series' sorted episode list.
+    Generators pass their generation time as now_iso for "updated_at".
+    """
+    if not episodes or count <= 0:
+        return []
+
+    # Get current cursor position for this channel+series
+    # (a missing cursor starts before the first episode)
+    channel_cursors = cursors.setdefault(channel_id, {})
+    current_index = channel_cursors.get(series_name, {}).get("last_index", -1)
+
+    total = len(episodes)
+    indices = [(current_index + 1 + i) % total for i in range(count)]
+    last_episode = episodes[indices[-1]]
+
+    # Update cursor
+    channel_cursors[series_name] = {
+        "season": last_episode["season"],
+        "episode": last_episode["episode"],
+        "last_index": indices[-1],
+        "updated_at": now_iso or app_now().isoformat()
+    }
+
+    return [episodes[i] for i in indices]
+
+
 def peek_next_episode_for_channel(channel_id: str, series_name: str,
                                    offset: int = 0,
-                                   cursors: dict = None, metadata: dict = None) -> Optional[dict]:
+                                   cursors: dict = None, metadata: dict = None,
+                                   episodes: List[dict] = None) -> Optional[dict]:
     """
     Peek at the next episode without advancing cursor.
     offset=0 means the very next episode, offset=1 means the one after, etc.
+    Pass `episodes` (the series' sorted episode list) to skip the metadata scan.
     """
     if cursors is None:
         cursors = load_episode_cursors()
-    if metadata is None:
-        metadata = load_metadata()
-
-    episodes = get_series_episodes(series_name, metadata)
+    if episodes is None:
+        episodes = get_series_episodes(series_name, metadata)
     if not episodes:
         return None
 
@@ -552,18 +804,9 @@ def peek_next_episode_for_channel(channel_id: str, series_name: str,
 # WEEKLY SCHEDULE GENERATOR
 # ============================================================================
 
-def select_back_to_back_count() -> int:
+def select_back_to_back_count(rng: random.Random = random) -> int:
     """Select number of episodes to play back-to-back based on probability weights."""
-    total = sum(BACK_TO_BACK_WEIGHTS.values())
-    roll = random.randint(1, total)
-
-    cumulative = 0
-    for count, weight in sorted(BACK_TO_BACK_WEIGHTS.items()):
-        cumulative += weight
-        if roll <= cumulative:
-            return count
-
-    return 2  # Default fallback
+    return rng.choices(_BACK_TO_BACK_COUNTS, cum_weights=_BACK_TO_BACK_CUMULATIVE)[0]
 
 
 def get_eligible_series_for_time(time_of_day: str, channel_series: List[str],
@@ -583,7 +826,26 @@ def get_eligible_series_for_time(time_of_day: str, channel_series: List[str],
     return eligible
 
 
-def generate_weekly_schedule(channel_id: str = None) -> dict:
+def group_series_by_time_of_day(channel_series: List[str],
+                                series_data: dict) -> Dict[str, List[str]]:
+    """
+    Bucket a channel's series by eligible time of day in one pass.
+    Each bucket matches get_eligible_series_for_time() for that period,
+    including order; "any" series land in every bucket.
+    """
+    buckets = {time_of_day: [] for time_of_day in TIME_OF_DAY_RANGES}
+    for series_name in channel_series:
+        series_time = series_data.get(series_name, {}).get("time_of_day", "any")
+        if series_time == "any":
+            for eligible in buckets.values():
+                eligible.append(series_name)
+        elif series_time in buckets:
+            buckets[series_time].append(series_name)
+    return buckets
+
+
+@_serialized_generation
+def generate_weekly_schedule(channel_id: str = None, now: datetime = None) -> dict:
     """
     Generate a new weekly schedule.
     Assigns series to time-of-day slots for each channel with series_filter.
@@ -591,6 +853,7 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
     Args:
         channel_id: Optional. If provided, only regenerates for this specific channel,
                    preserving the existing schedule for other channels.
+        now: Optional. Generation time; defaults to app_now().
     """
     if channel_id:
         logger.info(f"[SCHEDULER] Generating weekly schedule for channel: {channel_id}")
@@ -600,7 +863,8 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
     canales = load_canales()
     series_data = load_series()
 
-    now = app_now()
+    if now is None:
+        now = app_now()
     # Find the most recent Sunday
     days_since_sunday = now.weekday() + 1  # Monday=0, Sunday=6, so +1
     if days_since_sunday == 7:
@@ -609,8 +873,11 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
 
     # If regenerating for a single channel, load existing schedule first
     if channel_id:
-        schedule = load_weekly_schedule()
-        if not schedule:
+        # Copy the (shared) loaded schedule down to the channel map we replace into
+        schedule = dict(load_weekly_schedule())
+        if schedule:
+            schedule["channels"] = dict(schedule.get("channels", {}))
+        else:
             schedule = {
                 "generated_at": now.isoformat(),
                 "week_start": str(week_start),
@@ -619,27 +886,30 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
         # Update timestamp
         schedule["generated_at"] = now.isoformat()
         schedule["week_start"] = str(week_start)
-        channels_to_process = {channel_id: canales.get(channel_id, {})}
+        channels_to_process = get_broadcast_channels({channel_id: canales.get(channel_id, {})})
     else:
         schedule = {
             "generated_at": now.isoformat(),
             "week_start": str(week_start),
             "channels": {}
         }
-        channels_to_process = canales
+        channels_to_process = get_broadcast_channels(canales)
 
-    for cid, config in channels_to_process.items():
-        series_filter = config.get("series_filter", [])
-        if not series_filter:
-            continue  # Skip non-series channels
+    for cid, config in channels_to_process:
+        series_filter = config["series_filter"]
+        # Deliberately unseeded: a forced per-channel rebuild
+        # (/api/rebuild_schedule) must produce a new lineup
+        rng = random.Random()
 
         channel_schedule = {
             "time_slots": {},
-            "block_offset_sec": random.randint(0, BLOCK_OFFSET_MAX_SEC),
+            "block_offset_sec": rng.randint(0, BLOCK_OFFSET_MAX_SEC),
         }
 
+        eligible_by_time = group_series_by_time_of_day(series_filter, series_data)
+
         for time_of_day, slot_count in TIME_OF_DAY_SLOTS.items():
-            eligible = get_eligible_series_for_time(time_of_day, series_filter, series_data)
+            eligible = eligible_by_time[time_of_day]
 
             if not eligible:
                 # No eligible series for this time - will show test pattern
@@ -647,17 +917,18 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
                 logger.warning(f"[SCHEDULER] No eligible series for {cid} during {time_of_day}")
                 continue
 
-            # Fill slots with series using back-to-back probability
-            slots = []
-            while len(slots) < slot_count:
-                series = random.choice(eligible)
-                back_to_back = select_back_to_back_count()
+            # Fill slots with series using back-to-back probability.
+            # Every run is at least one slot long, so slot_count picks and
+            # run lengths always cover the period; draw them in one batch
+            # and expand each pick into its run.
+            picks = rng.choices(eligible, k=slot_count)
+            runs = rng.choices(_BACK_TO_BACK_COUNTS, cum_weights=_BACK_TO_BACK_CUMULATIVE,
+                               k=slot_count)
+            slots = list(itertools.islice(
+                itertools.chain.from_iterable(map(itertools.repeat, picks, runs)),
+                slot_count))
 
-                # Add series for back_to_back slots (or remaining slots, whichever is less)
-                for _ in range(min(back_to_back, slot_count - len(slots))):
-                    slots.append(series)
-
-            channel_schedule["time_slots"][time_of_day] = slots[:slot_count]
+            channel_schedule["time_slots"][time_of_day] = slots
 
         schedule["channels"][cid] = channel_schedule
         logger.info(f"[SCHEDULER] Channel {cid} block offset: {channel_schedule['block_offset_sec']}s ({channel_schedule['block_offset_sec']/60:.1f}min)")
@@ -676,21 +947,30 @@ def generate_weekly_schedule(channel_id: str = None) -> dict:
 # DAILY SCHEDULE GENERATOR
 # ============================================================================
 
+# Period boundaries sorted by start hour, for bisect classification.
+# Hours before the first period start (0-3am) belong to the previous night,
+# so they are shifted by 24 before the lookup.
+_PERIOD_BOUNDARIES = sorted((start, name) for name, (start, _) in TIME_OF_DAY_RANGES.items())
+_PERIOD_STARTS = [start for start, _ in _PERIOD_BOUNDARIES]
+_PERIOD_NAMES = [name for _, name in _PERIOD_BOUNDARIES]
+
+
+def _period_for_hour(hour: int) -> Tuple[str, int]:
+    """Return (time_of_day, hours_into_period) for an hour of the day."""
+    effective_hour = hour + 24 if hour < _PERIOD_STARTS[0] else hour
+    i = bisect.bisect_right(_PERIOD_STARTS, effective_hour) - 1
+    return _PERIOD_NAMES[i], effective_hour - _PERIOD_STARTS[i]
+
+
+# (time_of_day, hours_into_period) for every hour of the day
+_HOUR_TO_PERIOD = tuple(_period_for_hour(hour) for hour in range(24))
+_HOUR_TO_TOD = tuple(time_of_day for time_of_day, _ in _HOUR_TO_PERIOD)
+
+
 def get_time_of_day_for_hour(hour: int) -> str:
     """Determine which time-of-day period an hour falls into."""
-    # Handle wrap-around for night (9pm-3am spans midnight)
-    if hour >= 21 or hour < 3:
-        return "night"
-    elif 4 <= hour < 7:
-        return "early_morning"
-    elif 7 <= hour < 12:
-        return "late_morning"
-    elif 12 <= hour < 17:
-        return "afternoon"
-    elif 17 <= hour < 21:
-        return "evening"
-    else:
-        return "night"  # 3am falls into test pattern, but just in case
+    # 9pm-3am wraps midnight; 3am itself is test pattern but maps to night
+    return _HOUR_TO_TOD[hour % 24]
 
 
 def get_slot_index_for_time(hour: int, minute: int) -> Tuple[str, int]:
@@ -698,19 +978,7 @@ def get_slot_index_for_time(hour: int, minute: int) -> Tuple[str, int]:
     Get the time-of-day period and slot index for a given time.
     Returns (time_of_day, slot_index_within_period).
     """
-    time_of_day = get_time_of_day_for_hour(hour)
-
-    # Calculate slot index within the time-of-day period
-    period_start_hour, _ = TIME_OF_DAY_RANGES.get(time_of_day, (4, 7))
-
-    # Handle night period wrap-around
-    if time_of_day == "night":
-        if hour >= 21:
-            hours_into_period = hour - 21
-        else:
-            hours_into_period = (hour + 24 - 21)  # e.g., 1am = 4 hours into night
-    else:
-        hours_into_period = hour - period_start_hour
+    time_of_day, hours_into_period = _HOUR_TO_PERIOD[hour % 24]
 
     # Each hour has 2 slots (30 min each)
     slot_index = hours_into_period * 2 + (1 if minute >= 30 else 0)
@@ -718,11 +986,15 @@ def get_slot_index_for_time(hour: int, minute: int) -> Tuple[str, int]:
     return time_of_day, slot_index
 
 
-def build_commercial_sequence(duration_needed: float, commercials: List[dict]) -> List[dict]:
+def build_commercial_sequence(duration_needed: float, commercials: List[dict],
+                              rng: random.Random = random,
+                              shuffle_in_place: bool = False) -> List[dict]:
     """
     Build a sequence of commercials to fill the specified duration.
     Loops commercials if not enough unique ones available.
     Returns list of dicts with video_id, duration, and start_offset.
+    With shuffle_in_place the caller owns `commercials` and lets it be
+    reshuffled directly instead of copied on every break.
     """
     if not commercials:
         # No commercials available - use sponsors placeholder
@@ -740,35 +1012,59 @@ def build_commercial_sequence(duration_needed: float, commercials: List[dict]) -
 
     sequence = []
     remaining = duration_needed
-    commercial_pool = commercials.copy()
-    random.shuffle(commercial_pool)
-    pool_index = 0
+    commercial_pool = commercials if shuffle_in_place else commercials.copy()
 
     while remaining > 0:
-        if pool_index >= len(commercial_pool):
-            # Loop back to start
-            random.shuffle(commercial_pool)
-            pool_index = 0
-
-        comm = commercial_pool[pool_index]
-        comm_duration = comm.get("duration", 30)
-
-        sequence.append({
-            "type": "commercial",
-            "video_id": comm["video_id"],
-            "duration": min(comm_duration, remaining),
-        })
-
-        remaining -= comm_duration
-        pool_index += 1
+        # Shuffle a pass over the pool (again each time it is exhausted)
+        # and cut it at the first commercial whose end reaches the break
+        rng.shuffle(commercial_pool)
+        ends = list(itertools.accumulate(comm.get("duration", 30) for comm in commercial_pool))
+        count = bisect.bisect_left(ends, remaining) + 1
+
+        for comm in commercial_pool[:count]:
+            comm_duration = comm.get("duration", 30)
+            sequence.append({
+                "type": "commercial",
+                "video_id": comm["video_id"],
+                "duration": min(comm_duration, remaining),
+            })
+            remaining -= comm_duration
 
     return sequence
 
 
+@functools.lru_cache(maxsize=16)
+def daily_block_slots(block_offset: int) -> Tuple[Tuple[int, str, int], ...]:
+    """
+    Return (block_start_second, time_of_day, slot_index) for the 46
+    half-hour blocks of a broadcast day shifted by block_offset.
+
+    Memoized per offset: every channel with the same weekly offset shares
+    one table, so the per-block time arithmetic runs once per generation.
+    """
+    blocks = []
+    for block_num in range(46):
+        block_start_second = 3600 + block_offset + (block_num * BLOCK_DURATION_SEC)
+
+        # Calculate what time this block represents
+        total_seconds_from_midnight = (3 * 3600) + block_start_second  # 3am base
+        block_hour = (total_seconds_from_midnight // 3600) % 24
+        block_minute = (total_seconds_from_midnight % 3600) // 60
+
+        time_of_day, slot_index = get_slot_index_for_time(block_hour, block_minute)
+        blocks.append((block_start_second, time_of_day, slot_index))
+    return tuple(blocks)
+
+
+@functools.lru_cache(maxsize=64)
 def calculate_block_structure(episode_duration: float, block_duration: float = BLOCK_DURATION_SEC) -> dict:
     """
     Calculate how an episode fits into 30-minute blocks.
     Returns a dict describing the block structure.
+
+    Memoized per (duration, block length): episodes of a series share a
+    duration, so the returned dict is shared between callers and must
+    not be mutated.
     """
     if episode_duration <= 0:
         return {"type": "skip", "blocks": 0}
@@ -794,9 +1090,12 @@ def calculate_block_structure(episode_duration: float, block_duration: float = B
 def generate_block_schedule(block_start_second: int,
                            episodes: List[dict],
                            commercials: List[dict],
-                           block_duration: float = BLOCK_DURATION_SEC) -> List[dict]:
+                           block_duration: float = BLOCK_DURATION_SEC,
+                           rng: random.Random = random,
+                           shuffle_in_place: bool = False) -> List[dict]:
     """
     Generate second-by-second schedule entries for a 30-minute block.
+    shuffle_in_place is passed on to build_commercial_sequence().
 
     Block structure:
     - Commercial break 1 (start)
@@ -826,9 +1125,14 @@ def generate_block_schedule(block_start_second: int,
         ep_duration = ep.get("duration", 0)
         half_ep = ep_duration / 2
 
+        # All three breaks are the same length; fill them up front
+        start_break, middle_break, end_break = (
+            build_commercial_sequence(commercial_break_duration, commercials, rng,
+                                      shuffle_in_place)
+            for _ in range(COMMERCIAL_BREAKS_PER_BLOCK))
+
         # Commercial break 1 (start)
-        comm_seq = build_commercial_sequence(commercial_break_duration, commercials)
-        for comm in comm_seq:
+        for comm in start_break:
             entries.append({
                 "start": current_second,
                 "end": current_second + comm["duration"],
@@ -850,8 +1154,7 @@ def generate_block_schedule(block_start_second: int,
         current_second += half_ep
 
         # Commercial break 2 (middle)
-        comm_seq = build_commercial_sequence(commercial_break_duration, commercials)
-        for comm in comm_seq:
+        for comm in middle_break:
             entries.append({
                 "start": current_second,
                 "end": current_second + comm["duration"],
@@ -873,18 +1176,15 @@ def generate_block_schedule(block_start_second: int,
         current_second += half_ep
 
         # Commercial break 3 (end)
-        remaining_time = block_start_second + block_duration - current_second
-        if remaining_time > 0:
-            comm_seq = build_commercial_sequence(remaining_time, commercials)
-            for comm in comm_seq:
-                entries.append({
-                    "start": current_second,
-                    "end": current_second + comm["duration"],
-                    "type": comm["type"],
-                    "video_id": comm["video_id"],
-                    "base_timestamp": 0,
-                })
-                current_second += comm["duration"]
+        for comm in end_break:
+            entries.append({
+                "start": current_second,
+                "end": current_second + comm["duration"],
+                "type": comm["type"],
+                "video_id": comm["video_id"],
+                "base_timestamp": 0,
+            })
+            current_second += comm["duration"]
 
     else:
         # Multiple episodes: distribute with commercials between
@@ -893,7 +1193,8 @@ def generate_block_schedule(block_start_second: int,
         for i, ep in enumerate(episodes):
             # Commercial before each episode
             if per_episode_commercial > 0:
-                comm_seq = build_commercial_sequence(per_episode_commercial, commercials)
+                comm_seq = build_commercial_sequence(per_episode_commercial, commercials, rng,
+                                                     shuffle_in_place)
                 for comm in comm_seq:
                     entries.append({
                         "start": current_second,
@@ -919,7 +1220,145 @@ def generate_block_schedule(block_start_second: int,
     return entries
 
 
-def generate_daily_schedule(channel_id: str = None) -> dict:
+def _build_channel_entries(cid: str, channel_weekly: dict, commercials: List[dict],
+                           episodes_by_series: Dict[str, List[dict]], cursors: dict,
+                           rng: random.Random, now_iso: str) -> List[dict]:
+    """
+    Build one channel's daily entries from its weekly slots.
+    Only this channel's cursors are advanced, so channels are independent.
+    """
+    time_slots = channel_weekly.get("time_slots", {})
+    block_offset = channel_weekly.get("block_offset_sec", 0)
+    # Fresh list owned by this channel: breaks reshuffle it in place
+    channel_commercials = filter_commercials_for_channel(commercials, cid)
+    channel_entries = []
+
+    # Test pattern: 3am until programming starts (4am + offset)
+    channel_entries.append({
+        "start": 0,
+        "end": 3600 + block_offset,
+        "type": "test_pattern",
+        "video_id": "__test_pattern__",
+    })
+
+    # Process each 30-minute block from (4am + offset) to (3am + offset)
+    # 46 blocks of 30 minutes each, shifted by the channel's weekly offset
+    # so commercial breaks don't align across channels.
+    # A long episode owns every block it spans; those blocks are skipped.
+    next_free_block = 0
+
+    for block_num, (block_start_second, time_of_day, slot_index) in enumerate(
+            daily_block_slots(block_offset)):
+        if block_num < next_free_block:
+            continue
+
+        # Get series assigned to this slot from weekly schedule
+        slots_for_period = time_slots.get(time_of_day, [])
+        if slot_index < len(slots_for_period):
+            series_name = slots_for_period[slot_index]
+        else:
+            series_name = "__test_pattern__"
+
+        if series_name == "__test_pattern__":
+            # Show test pattern for this block
+            channel_entries.append({
+                "start": block_start_second,
+                "end": block_start_second + BLOCK_DURATION_SEC,
+                "type": "test_pattern",
+                "video_id": "__test_pattern__",
+            })
+            continue
+
+        # Get episodes for this block
+        # First, peek at next episode to determine block structure
+        series_episodes = episodes_by_series.get(series_name, [])
+        next_ep = peek_next_episode_for_channel(cid, series_name, 0, cursors,
+                                                episodes=series_episodes)
+
+        if not next_ep:
+            # No episodes - show test pattern
+            channel_entries.append({
+                "start": block_start_second,
+                "end": block_start_second + BLOCK_DURATION_SEC,
+                "type": "test_pattern",
+                "video_id": "__test_pattern__",
+            })
+            continue
+
+        ep_duration = next_ep.get("duration", 0)
+        block_structure = calculate_block_structure(ep_duration)
+
+        # Collect episodes for this block
+        episodes_needed = block_structure.get("episodes_per_block", 1)
+        block_episodes = advance_episodes_for_channel(cid, series_name, episodes_needed,
+                                                      cursors, series_episodes, now_iso)
+
+        if not block_episodes:
+            channel_entries.append({
+                "start": block_start_second,
+                "end": block_start_second + BLOCK_DURATION_SEC,
+                "type": "test_pattern",
+                "video_id": "__test_pattern__",
+            })
+            continue
+
+        # Handle multi-block episodes
+        if block_structure["blocks"] > 1:
+            # For long episodes spanning multiple blocks, we generate entries
+            # for all blocks the episode spans
+            total_duration = block_episodes[0].get("duration", 0)
+            blocks_to_span = block_structure["blocks"]
+
+            # Generate entries for all blocks
+            ep = block_episodes[0]
+            time_per_block = total_duration / blocks_to_span
+
+            for span_block in range(blocks_to_span):
+                span_start = block_start_second + (span_block * BLOCK_DURATION_SEC)
+                span_end = span_start + BLOCK_DURATION_SEC
+
+                # Commercial time per block
+                commercial_time = BLOCK_DURATION_SEC - time_per_block
+                commercial_per_break = commercial_time / COMMERCIAL_BREAKS_PER_BLOCK
+
+                block_entries = generate_block_schedule(
+                    span_start,
+                    [{"video_id": ep["video_id"],
+                      "series_path": ep.get("series_path"),
+                      "duration": time_per_block,
+                      "_base_offset": span_block * time_per_block}],
+                    channel_commercials,
+                    BLOCK_DURATION_SEC,
+                    rng,
+                    shuffle_in_place=True,
+                )
+
+                # Adjust base_timestamp for spanning blocks
+                for entry in block_entries:
+                    if entry["type"] == "episode":
+                        entry["base_timestamp"] = span_block * time_per_block
+
+                channel_entries.extend(block_entries)
+
+            # The following blocks belong to this episode
+            next_free_block = block_num + blocks_to_span
+        else:
+            # Single block - generate normally
+            block_entries = generate_block_schedule(
+                block_start_second,
+                block_episodes,
+                channel_commercials,
+                BLOCK_DURATION_SEC,
+                rng,
+                shuffle_in_place=True,
+            )
+            channel_entries.extend(block_entries)
+
+    return channel_entries
+
+
+@_serialized_generation
+def generate_daily_schedule(channel_id: str = None, now: datetime = None) -> dict:
     """
     Generate a new daily schedule.
     Creates second-by-second (actually range-based) mapping for each channel.
@@ -928,6 +1367,7 @@ def generate_daily_schedule(channel_id: str = None) -> dict:
     Args:
         channel_id: Optional. If provided, only regenerates for this specific channel,
                    preserving the existing schedule for other channels.
+        now: Optional. Generation time; defaults to app_now().
     """
     if channel_id:
         logger.info(f"[SCHEDULER] Generating daily schedule for channel: {channel_id}")
@@ -941,9 +1381,13 @@ def generate_daily_schedule(channel_id: str = None) -> dict:
     metadata = load_metadata()
     cursors = load_episode_cursors()
     commercials = get_commercials(metadata)
+    episodes_by_series = get_episodes_by_series(metadata)
 
-    now = app_now()
+    if now is None:
+        now = app_now()
     schedule_date = now.date()
+    # Stamped on the schedule and on every cursor this run advances
+    now_iso = now.isoformat()
 
     # Schedule validity
     # If before 3am, we're still on yesterday's schedule conceptually,
@@ -952,180 +1396,51 @@ def generate_daily_schedule(channel_id: str = None) -> dict:
     valid_until = datetime.combine(schedule_date + timedelta(days=1),
                                    datetime.min.time().replace(hour=3))
 
-    # If regenerating for a single channel, load existing schedule first
+    # If regenerating for a single channel, start from the existing schedule.
+    # Copy it: the cached dict is being read by lookups until
+    # save_daily_schedule() swaps the new one in.
     if channel_id:
-        schedule = load_daily_schedule()
-        if not schedule:
+        schedule = dict(load_daily_schedule())
+        if schedule:
+            schedule["channels"] = dict(schedule.get("channels", {}))
+        else:
             schedule = {
-                "generated_at": now.isoformat(),
+                "generated_at": now_iso,
                 "schedule_date": str(schedule_date),
                 "valid_from": valid_from.isoformat(),
                 "valid_until": valid_until.isoformat(),
                 "channels": {}
             }
         # Update timestamps
-        schedule["generated_at"] = now.isoformat()
+        schedule["generated_at"] = now_iso
         schedule["schedule_date"] = str(schedule_date)
         schedule["valid_from"] = valid_from.isoformat()
         schedule["valid_until"] = valid_until.isoformat()
-        channels_to_process = {channel_id: canales.get(channel_id, {})}
+        channels_to_process = get_broadcast_channels({channel_id: canales.get(channel_id, {})})
     else:
         schedule = {
-            "generated_at": now.isoformat(),
+            "generated_at": now_iso,
             "schedule_date": str(schedule_date),
             "valid_from": valid_from.isoformat(),
             "valid_until": valid_until.isoformat(),
             "channels": {}
         }
-        channels_to_process = canales
-
-    for cid, config in channels_to_process.items():
-        series_filter = config.get("series_filter", [])
-        if not series_filter:
-            continue
+        channels_to_process = get_broadcast_channels(canales)
 
+    for cid, config in channels_to_process:
+        # Seeded per date and channel, so a day's schedule is reproducible
+        rng = random.Random(f"{schedule_date}:{cid}")
         channel_weekly = weekly_schedule.get("channels", {}).get(cid, {})
         if not channel_weekly:
             logger.warning(f"[SCHEDULER] No weekly schedule for channel {cid}")
             continue
 
-        time_slots = channel_weekly.get("time_slots", {})
-        block_offset = channel_weekly.get("block_offset_sec", 0)
-        channel_commercials = filter_commercials_for_channel(commercials, cid)
-        channel_entries = []
-
-        # Test pattern: 3am until programming starts (4am + offset)
-        channel_entries.append({
-            "start": 0,
-            "end": 3600 + block_offset,
-            "type": "test_pattern",
-            "video_id": "__test_pattern__",
-        })
-
-        # Process each 30-minute block from (4am + offset) to (3am + offset)
-        # 46 blocks of 30 minutes each, shifted by the channel's weekly offset
-        # so commercial breaks don't align across channels.
-
-        current_second = 3600 + block_offset
-
-        for block_num in range(46):  # 46 half-hour blocks
-            block_start_second = 3600 + block_offset + (block_num * BLOCK_DURATION_SEC)
-
-            # Calculate what time this block represents
-            total_seconds_from_midnight = (3 * 3600) + block_start_second  # 3am base
-            block_hour = (total_seconds_from_midnight // 3600) % 24
-            block_minute = (total_seconds_from_midnight % 3600) // 60
-
-            time_of_day, slot_index = get_slot_index_for_time(block_hour, block_minute)
-
-            # Get series assigned to this slot from weekly schedule
-            slots_for_period = time_slots.get(time_of_day, [])
-            if slot_index < len(slots_for_period):
-                series_name = slots_for_period[slot_index]
-            else:
-                series_name = "__test_pattern__"
-
-            if series_name == "__test_pattern__":
-                # Show test pattern for this block
-                channel_entries.append({
-                    "start": block_start_second,
-                    "end": block_start_second + BLOCK_DURATION_SEC,
-                    "type": "test_pattern",
-                    "video_id": "__test_pattern__",
-                })
-                continue
-
-            # Get episodes for this block
-            # First, peek at next episode to determine block structure
-            next_ep = peek_next_episode_for_channel(cid, series_name, 0, cursors, metadata)
-
-            if not next_ep:
-                # No episodes - show test pattern
-                channel_entries.append({
-                    "start": block_start_second,
-                    "end": block_start_second + BLOCK_DURATION_SEC,
-                    "type": "test_pattern",
-                    "video_id": "__test_pattern__",
-                })
-                continue
-
-            ep_duration = next_ep.get("duration", 0)
-            block_structure = calculate_block_structure(ep_duration)
-
-            # Collect episodes for this block
-            block_episodes = []
-            episodes_needed = block_structure.get("episodes_per_block", 1)
-
-            for i in range(episodes_needed):
-                ep = get_next_episode_for_channel(cid, series_name, cursors, metadata)
-                if ep:
-                    block_episodes.append(ep)
-
-            if not block_episodes:
-                channel_entries.append({
-                    "start": block_start_second,
-                    "end": block_start_second + BLOCK_DURATION_SEC,
-                    "type": "test_pattern",
-                    "video_id": "__test_pattern__",
-                })
-                continue
-
-            # Handle multi-block episodes
-            if block_structure["blocks"] > 1:
-                # For long episodes spanning multiple blocks, we generate entries
-                # for all blocks the episode spans
-                total_duration = block_episodes[0].get("duration", 0)
-                blocks_to_span = block_structure["blocks"]
-
-                # Generate entries for all blocks
-                ep = block_episodes[0]
-                time_per_block = total_duration / blocks_to_span
-
-                for span_block in range(blocks_to_span):
-                    span_start = block_start_second + (span_block * BLOCK_DURATION_SEC)
-                    span_end = span_start + BLOCK_DURATION_SEC
-
-                    # Commercial time per block
-                    commercial_time = BLOCK_DURATION_SEC - time_per_block
-                    commercial_per_break = commercial_time / COMMERCIAL_BREAKS_PER_BLOCK
-
-                    block_entries = generate_block_schedule(
-                        span_start,
-                        [{"video_id": ep["video_id"],
-                          "series_path": ep.get("series_path"),
-                          "duration": time_per_block,
-                          "_base_offset": span_block * time_per_block}],
-                        channel_commercials,
-                        BLOCK_DURATION_SEC
-                    )
-
-                    # Adjust base_timestamp for spanning blocks
-                    for entry in block_entries:
-                        if entry["type"] == "episode":
-                            entry["base_timestamp"] = span_block * time_per_block
-
-                    channel_entries.extend(block_entries)
-
-                # Skip the extra blocks we've already scheduled
-                # (handled by block_num advancing normally)
-                # Actually we need to skip blocks - let's track this
-                # For simplicity, we'll let the loop continue and overwrite
-                # TODO: Better handling of multi-block episodes
-            else:
-                # Single block - generate normally
-                block_entries = generate_block_schedule(
-                    block_start_second,
-                    block_episodes,
-                    channel_commercials,
-                    BLOCK_DURATION_SEC
-                )
-                channel_entries.extend(block_entries)
-
-        schedule["channels"][cid] = channel_entries
+        schedule["channels"][cid] = _build_channel_entries(
+            cid, channel_weekly, commercials, episodes_by_series, cursors, rng, now_iso)
 
     # Save cursors (they were modified during generation)
     save_episode_cursors(cursors)
-    save_daily_schedule(schedule)
+    save_daily_schedule(schedule, channel_id)
 
     if channel_id:
         logger.info(f"[SCHEDULER] Daily schedule regenerated for channel: {channel_id}")
@@ -1138,187 +1453,265 @@ def generate_daily_schedule(channel_id: str = None) -> dict:
 # SCHEDULE LOOKUP
 # ============================================================================
 
+# Player URLs for the generated system videos, keyed by entry type
+TEST_PATTERN_URL = f"/videos/system/{TEST_PATTERN_VIDEO.name}"
+SPONSORS_PLACEHOLDER_URL = f"/videos/system/{SPONSORS_PLACEHOLDER_VIDEO.name}"
+_SYSTEM_VIDEO_URLS = {
+    "test_pattern": TEST_PATTERN_URL,
+    "sponsors_placeholder": SPONSORS_PLACEHOLDER_URL,
+}
+
+# Returned as-is (not copied) whenever a channel has nothing scheduled
+_TEST_PATTERN_FALLBACK = {
+    "type": "test_pattern",
+    "video_id": "__test_pattern__",
+    "video_url": TEST_PATTERN_URL,
+    "seek_to": 0,
+}
+
+
+
+def _entry_video_url(entry: dict) -> Optional[str]:
+    """Player URL for a daily schedule entry (None for unknown entry types)."""
+    entry_type = entry["type"]
+    if entry_type in _SYSTEM_VIDEO_URLS:
+        return _SYSTEM_VIDEO_URLS[entry_type]
+    if entry_type == "commercial":
+        return f"/videos/commercials/{entry['video_id']}.mp4"
+    if entry_type == "episode":
+        series_path = entry.get("series_path")
+        if series_path:
+            return f"/videos/{series_path}.mp4"
+        return f"/videos/{entry['video_id']}.mp4"
+    return None
+
+
+SECONDS_PER_DAY = 24 * 3600
+SCHEDULE_DAY_START_SEC = TEST_PATTERN_START_HOUR * 3600
+
+
+def seconds_since_schedule_start(timestamp: datetime) -> int:
+    """
+    Seconds elapsed since the 3am start of the schedule day.
+    Times before 3am belong to the tail of the previous schedule day, which
+    the modulo folds in without branching on the hour.
+    """
+    seconds_of_day = timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+    return (seconds_of_day - SCHEDULE_DAY_START_SEC) % SECONDS_PER_DAY
+
+
+def get_slot_at(channel_id: str, seconds_since_3am: float) -> Optional[ScheduleSlot]:
+    """
+    Return the daily schedule slot playing on a channel at the given second
+    of the schedule day, or None if nothing is scheduled there.
+    Reads the prebuilt index only; the cached schedule dict is never exposed.
+    """
+    load_daily_schedule()  # cold start: populate the cache and index
+    with _daily_schedule_cache_lock:
+        slot_starts, slots = _daily_schedule_index.get(channel_id, ([], []))
+
+    # Binary search for the slot containing this second
+    i = bisect.bisect_right(slot_starts, seconds_since_3am) - 1
+    if i >= 0 and seconds_since_3am < slots[i].end:
+        return slots[i]
+    return None
+
+
 def get_scheduled_content(channel_id: str, timestamp: datetime = None) -> Optional[dict]:
     """
     Get the scheduled content for a channel at a specific timestamp.
     Returns dict with video_id, seek_to timestamp, type, etc.
     Falls back to test pattern if no schedule exists.
+
+    The fallback is a shared module-level dict; callers must treat the
+    result as read-only.
     """
-    # Fallback response for when no schedule exists
-    fallback = {
-        "type": "test_pattern",
-        "video_id": "__test_pattern__",
-        "video_url": "/videos/system/test_pattern.mp4",
-        "seek_to": 0,
-    }
+    fallback = _TEST_PATTERN_FALLBACK
 
     if timestamp is None:
         timestamp = app_now()
 
-    schedule = load_daily_schedule()
-    if not schedule:
-        return fallback
-
-    channel_entries = schedule.get("channels", {}).get(channel_id, [])
-    if not channel_entries:
-        return fallback
-
-    # Calculate second-of-day relative to 3am start
-    # Our schedule day runs 3am to 3am
-    hour = timestamp.hour
-    minute = timestamp.minute
-    second = timestamp.second
-
-    if hour < 3:
-        # Before 3am - this is the end of yesterday's schedule
-        # But we treat it as late in today's schedule
-        seconds_since_3am = ((24 - 3) * 3600) + (hour * 3600) + (minute * 60) + second
-    else:
-        seconds_since_3am = ((hour - 3) * 3600) + (minute * 60) + second
-
-    # Binary search for the entry containing this second
-    for entry in channel_entries:
-        if entry["start"] <= seconds_since_3am < entry["end"]:
-            # Found the entry
-            offset_into_entry = seconds_since_3am - entry["start"]
-            base_timestamp = entry.get("base_timestamp", 0)
-
-            result = {
-                "type": entry["type"],
-                "video_id": entry["video_id"],
-                "seek_to": base_timestamp + offset_into_entry,
-            }
-
-            if entry["type"] == "test_pattern":
-                result["video_url"] = "/videos/system/test_pattern.mp4"
-            elif entry["type"] == "sponsors_placeholder":
-                result["video_url"] = "/videos/system/sponsors_placeholder.mp4"
-            elif entry["type"] == "commercial":
-                result["video_url"] = f"/videos/commercials/{entry['video_id']}.mp4"
-            elif entry["type"] == "episode":
-                series_path = entry.get("series_path")
-                if series_path:
-                    result["video_url"] = f"/videos/{series_path}.mp4"
-                else:
-                    result["video_url"] = f"/videos/{entry['video_id']}.mp4"
-
-            return result
+    seconds_since_3am = seconds_since_schedule_start(timestamp)
+    slot = get_slot_at(channel_id, seconds_since_3am)
+    if slot is not None:
+        seek_to = slot.base_timestamp + (seconds_since_3am - slot.start)
+        if slot.type == "test_pattern":
+            # The test pattern clip loops; keep every channel on the same phase
+            seek_to %= TEST_PATTERN_LOOP_SEC
+        result = {
+            "type": slot.type,
+            "video_id": slot.video_id,
+            "seek_to": seek_to,
+        }
+        if slot.video_url is not None:
+            result["video_url"] = slot.video_url
+        return result
 
     # No entry found - return test pattern as fallback
-    return {
-        "type": "test_pattern",
-        "video_id": "__test_pattern__",
-        "video_url": "/videos/system/test_pattern.mp4",
-        "seek_to": 0,
-    }
+    return fallback
 
 
 def is_broadcast_channel(channel_id: str) -> bool:
-    """Check if a channel is configured for broadcast scheduling."""
+    """
+    Check if a channel is configured for broadcast scheduling.
+    The broadcast id set is rebuilt only when canales.json changes.
+    """
+    global _broadcast_ids_memo
+
     canales = load_canales()
-    config = canales.get(channel_id, {})
-    return bool(config.get("series_filter"))
+    source, broadcast_ids = _broadcast_ids_memo
+    if source is not canales:
+        broadcast_ids = frozenset(cid for cid, _ in get_broadcast_channels(canales))
+        _broadcast_ids_memo = (canales, broadcast_ids)
+    return channel_id in broadcast_ids
 
 
 # ============================================================================
 # SCHEDULE CHECKS AND BACKGROUND LOOP
 # ============================================================================
 
+@functools.lru_cache(maxsize=4)
+def _parse_generated_at(value: str) -> datetime:
+    """
+    Parse a schedule_meta generation timestamp.
+    Memoized: every tick re-checks the same weekly/daily strings.
+    """
+    return datetime.fromisoformat(value)
+
+
+def _last_generated(meta: dict, kind: str, now: datetime) -> Optional[datetime]:
+    """
+    When the `kind` ("weekly" or "daily") schedule was last generated, in
+    now's timezone, or None if unknown. Reads the epoch key and falls back
+    to the ISO string that older schedule_meta.json files store.
+    """
+    try:
+        epoch = meta.get(f"{kind}_generated_epoch")
+        if epoch is not None:
+            return datetime.fromtimestamp(epoch, now.tzinfo)
+        last_generated = meta.get(f"{kind}_generated")
+        if not last_generated:
+            return None
+        last_dt = _parse_generated_at(last_generated)
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+    # Compare in now's timezone (naive legacy values are taken as local)
+    if now.tzinfo is not None:
+        if last_dt.tzinfo is None:
+            return last_dt.replace(tzinfo=now.tzinfo)
+        return last_dt.astimezone(now.tzinfo)
+    if last_dt.tzinfo is not None:
+        return last_dt.astimezone().replace(tzinfo=None)
+    return last_dt
+
+
 def needs_weekly_regeneration(meta: dict, now: datetime) -> bool:
     """Check if weekly schedule needs to be regenerated."""
     # Check if we have a weekly schedule at all
-    if not WEEKLY_SCHEDULE_FILE.exists():
+    # (os.path.exists: a bare stat() on the Path's cached string form)
+    if not os.path.exists(WEEKLY_SCHEDULE_FILE):
         logger.info("[SCHEDULER] No weekly schedule exists - need to generate")
         return True
 
-    last_generated = meta.get("weekly_generated")
-    if not last_generated:
+    last_dt = _last_generated(meta, "weekly", now)
+    if last_dt is None:
         return True
 
-    try:
-        last_dt = datetime.fromisoformat(last_generated)
-    except (ValueError, TypeError):
-        return True
-
-    # Check if it's Sunday and past 2:30am
-    if now.weekday() != 6:  # Not Sunday
-        return False
-
-    if now.hour < WEEKLY_SCHEDULE_HOUR:
-        return False
-    if now.hour == WEEKLY_SCHEDULE_HOUR and now.minute < WEEKLY_SCHEDULE_MINUTE:
-        return False
-
-    # It's Sunday past 2:30am - check if we've already generated today
-    if last_dt.date() == now.date() and last_dt.hour >= WEEKLY_SCHEDULE_HOUR:
-        return False
-
-    return True
+    # Due once the first Sunday 2:30am after the last generation has passed
+    return now >= _next_boundary(last_dt, WEEKLY_SCHEDULE_HOUR, WEEKLY_SCHEDULE_MINUTE, weekday=6)
 
 
 def needs_daily_regeneration(meta: dict, now: datetime) -> bool:
     """Check if daily schedule needs to be regenerated."""
     # Check if we have a daily schedule at all
-    if not DAILY_SCHEDULE_FILE.exists():
+    # (os.path.exists: a bare stat() on the Path's cached string form)
+    if not os.path.exists(DAILY_SCHEDULE_FILE):
         logger.info("[SCHEDULER] No daily schedule exists - need to generate")
         return True
 
-    last_generated = meta.get("daily_generated")
-    if not last_generated:
+    last_dt = _last_generated(meta, "daily", now)
+    if last_dt is None:
         return True
 
-    try:
-        last_dt = datetime.fromisoformat(last_generated)
-    except (ValueError, TypeError):
-        return True
+    # Due once the first 3am after the last generation has passed
+    return now >= _next_boundary(last_dt, DAILY_SCHEDULE_HOUR, DAILY_SCHEDULE_MINUTE)
 
-    # Check if it's past 3am
-    if now.hour < DAILY_SCHEDULE_HOUR:
-        # Before 3am - check if yesterday's schedule is still valid
-        yesterday = now.date() - timedelta(days=1)
-        if last_dt.date() == yesterday and last_dt.hour >= DAILY_SCHEDULE_HOUR:
-            return False
-        return True
 
-    if now.hour == DAILY_SCHEDULE_HOUR and now.minute < DAILY_SCHEDULE_MINUTE:
-        # Not quite 3am yet
-        if last_dt.date() == now.date() - timedelta(days=1):
-            return False
-        return True
+def _next_boundary(now: datetime, hour: int, minute: int, weekday: int = None) -> datetime:
+    """Next time strictly after `now` at hour:minute (on `weekday`, if given)."""
+    boundary = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if weekday is not None:
+        boundary += timedelta(days=(weekday - now.weekday()) % 7)
+    if boundary <= now:
+        boundary += timedelta(days=1 if weekday is None else 7)
+    return boundary
 
-    # Past 3am - check if we've already generated today
-    if last_dt.date() == now.date() and last_dt.hour >= DAILY_SCHEDULE_HOUR:
-        return False
 
-    return True
+# (year, month, day, hour, minute) of the last check_and_generate_schedules() run
+_last_check_minute: Optional[Tuple[int, int, int, int, int]] = None
+# Schedules ("weekly"/"daily") wake_scheduler() asked to rebuild even if not due
+_forced_regeneration: Set[str] = set()
 
 
-def check_and_generate_schedules() -> None:
-    """Check if schedules need regeneration and generate if needed."""
+def seconds_until_next_check(now: datetime) -> float:
+    """
+    Seconds the background loop may sleep after checking at `now`: until
+    the next daily (3:00am) or weekly (Sunday 2:30am) generation time,
+    capped at SCHEDULER_CHECK_INTERVAL.
+    """
+    next_fire = min(
+        _next_boundary(now, DAILY_SCHEDULE_HOUR, DAILY_SCHEDULE_MINUTE),
+        _next_boundary(now, WEEKLY_SCHEDULE_HOUR, WEEKLY_SCHEDULE_MINUTE, weekday=6),
+    )
+    return max(1.0, min(SCHEDULER_CHECK_INTERVAL, (next_fire - now).total_seconds()))
+
+
+def check_and_generate_schedules(now: datetime = None) -> None:
+    """
+    Check if schedules need regeneration and generate if needed.
+    `now` is the tick time; the same value is used for the checks, the
+    generated schedules and the recorded generation timestamps.
+
+    The checks only depend on the date, hour and minute, so a second tick
+    within the same minute returns early (wake_scheduler() resets this).
+    Schedules requested through wake_scheduler() are rebuilt even if not due.
+    """
+    global _last_check_minute, _forced_regeneration
+
+    if now is None:
+        now = app_now()
+    check_minute = (now.year, now.month, now.day, now.hour, now.minute)
+    if check_minute == _last_check_minute:
+        return
+    _last_check_minute = check_minute
+    forced, _forced_regeneration = _forced_regeneration, set()
+
     meta = load_schedule_meta()
-    now = app_now()
 
     schedules_updated = False
 
     # Check weekly schedule
-    if needs_weekly_regeneration(meta, now):
+    if "weekly" in forced or needs_weekly_regeneration(meta, now):
         try:
-            generate_weekly_schedule()
-            meta["weekly_generated"] = now.isoformat()
+            generate_weekly_schedule(now=now)
+            meta["weekly_generated_epoch"] = int(now.timestamp())
+            meta.pop("weekly_generated", None)  # pre-epoch ISO key
             schedules_updated = True
             logger.info("[SCHEDULER] Weekly schedule regenerated")
         except Exception as e:
-            logger.error(f"[SCHEDULER] Failed to generate weekly schedule: {e}")
+            logger.error("[SCHEDULER] Failed to generate weekly schedule: %s", e)
 
     # Check daily schedule
-    if needs_daily_regeneration(meta, now):
+    if "daily" in forced or needs_daily_regeneration(meta, now):
         try:
-            generate_daily_schedule()
-            meta["daily_generated"] = now.isoformat()
+            generate_daily_schedule(now=now)
+            meta["daily_generated_epoch"] = int(now.timestamp())
+            meta.pop("daily_generated", None)  # pre-epoch ISO key
             schedules_updated = True
             logger.info("[SCHEDULER] Daily schedule regenerated")
         except Exception as e:
-            logger.error(f"[SCHEDULER] Failed to generate daily schedule: {e}")
+            logger.error("[SCHEDULER] Failed to generate daily schedule: %s", e)
 
     if schedules_updated:
         save_schedule_meta(meta)
@@ -1327,21 +1720,25 @@ def check_and_generate_schedules() -> None:
 # Background scheduler thread
 _scheduler_thread = None
 _scheduler_running = False
+_scheduler_wake = threading.Event()  # Set to cut the loop's sleep short
 
 
 def _scheduler_loop():
-    """Background loop that checks for schedule updates every 5 seconds."""
+    """Background loop that checks for schedule updates at generation times."""
     global _scheduler_running
 
     logger.info("[SCHEDULER] Background scheduler loop started")
 
     while _scheduler_running:
+        sleep_time = SCHEDULER_CHECK_INTERVAL
         try:
-            check_and_generate_schedules()
+            check_and_generate_schedules(app_now())
+            sleep_time = seconds_until_next_check(app_now())
         except Exception as e:
-            logger.error(f"[SCHEDULER] Error in scheduler loop: {e}")
+            logger.error("[SCHEDULER] Error in scheduler loop: %s", e)
 
-        time.sleep(SCHEDULER_CHECK_INTERVAL)
+        _scheduler_wake.wait(sleep_time)
+        _scheduler_wake.clear()
 
     logger.info("[SCHEDULER] Background scheduler loop stopped")
 
@@ -1355,17 +1752,38 @@ def start_scheduler():
         return
 
     _scheduler_running = True
+    _scheduler_wake.clear()
     _scheduler_thread = threading.Thread(target=_scheduler_loop, daemon=True)
     _scheduler_thread.start()
 
     logger.info("[SCHEDULER] Background scheduler started")
 
 
+def wake_scheduler(weekly: bool = False, daily: bool = False):
+    """
+    Run a schedule check now instead of at the loop's next wake-up.
+
+    Args:
+        weekly: Rebuild the weekly schedule (and the daily one built from
+            it) on that check, e.g. after a channel config change.
+        daily: Rebuild the daily schedule, e.g. after new content is added.
+    """
+    global _last_check_minute
+
+    if weekly:
+        _forced_regeneration.update(("weekly", "daily"))
+    elif daily:
+        _forced_regeneration.add("daily")
+    _last_check_minute = None
+    _scheduler_wake.set()
+
+
 def stop_scheduler():
     """Stop the background scheduler thread."""
     global _scheduler_running
 
     _scheduler_running = False
+    _scheduler_wake.set()
     logger.info("[SCHEDULER] Background scheduler stop requested")
 
 
@@ -1373,24 +1791,53 @@ def stop_scheduler():
 # INITIALIZATION
 # ============================================================================
 
-def initialize_scheduler():
-    """Initialize the scheduler module."""
-    logger.info("[SCHEDULER] Initializing scheduler module...")
+_scheduler_ready = threading.Event()  # Set once startup generation/warm-up is done
 
-    # Ensure content directory exists
-    CONTENT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Ensure system videos exist
-    ensure_system_videos_exist()
+def _startup_warmup():
+    """Prepare system videos and schedules, then start the background loop."""
+    try:
+        # Ensure system videos exist
+        ensure_system_videos_exist()
 
-    # Check if we need to generate schedules immediately
-    check_and_generate_schedules()
+        # Check if we need to generate schedules immediately
+        check_and_generate_schedules()
 
-    # Warm the cache for fast channel switching
-    # (if schedule was just generated, cache is already warm via save_daily_schedule)
-    warm_daily_schedule_cache()
+        # Warm the cache for fast channel switching
+        # (if schedule was just generated, cache is already warm via save_daily_schedule)
+        warm_daily_schedule_cache()
+    except Exception as e:
+        logger.error(f"[SCHEDULER] Startup warm-up failed: {e}")
+    finally:
+        _scheduler_ready.set()
 
-    # Start background loop
+    # Start background loop (it retries anything that failed above)
     start_scheduler()
 
     logger.info("[SCHEDULER] Scheduler module initialized")
+
+
+def wait_until_ready(timeout: float = None) -> bool:
+    """Block until startup warm-up has finished; False if it timed out."""
+    return _scheduler_ready.wait(timeout)
+
+
+def initialize_scheduler(background: bool = True):
+    """
+    Initialize the scheduler module.
+
+    System video generation and the first schedule build can take seconds
+    on the Pi, so by default they run on a background thread and the app
+    starts serving right away (lookups fall back to the test pattern until
+    the schedule is ready). Use wait_until_ready() to block on it.
+    """
+    logger.info("[SCHEDULER] Initializing scheduler module...")
+
+    # Ensure content directory exists
+    CONTENT_DIR.mkdir(parents=True, exist_ok=True)
+
+    _scheduler_ready.clear()
+    if background:
+        threading.Thread(target=_startup_warmup, daemon=True).start()
+    else:
+        _startup_warmup()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Test cases for the metadata daemon's in-process helpers.
+Covers the MP4 mvhd duration reader, the SQLite results journal,
+loudness sampling, how the phases share work and the idle wait.
+"""
+
+import json
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Set up test environment before touching the daemon's files
+TEST_DIR = tempfile.mkdtemp(prefix="tvargenta_daemon_test_")
+TEST_CONTENT_DIR = Path(TEST_DIR) / "content"
+TEST_CONTENT_DIR.mkdir(parents=True, exist_ok=True)
+
+import metadata_daemon
+
+# Override daemon paths
+metadata_daemon.CONTENT_DIR = TEST_CONTENT_DIR
+metadata_daemon.METADATA_FILE = TEST_CONTENT_DIR / "metadata.json"
+metadata_daemon.METADATA_LOCK_FILE = TEST_CONTENT_DIR / ".metadata.lock"
+metadata_daemon.RESULTS_JOURNAL_FILE = TEST_CONTENT_DIR / "metadata_results.sqlite"
+metadata_daemon.logger = logging.getLogger("metadata_daemon.test")
+
+
+def mp4_box(box_type, payload):
+    """Build an MP4 box with a 32-bit size header."""
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def mvhd_v0(timescale, duration):
+    """mvhd payload, version 0 (32-bit times and duration)."""
+    return struct.pack(">B3xIIII", 0, 0, 0, timescale, duration) + bytes(80)
+
+
+def mvhd_v1(timescale, duration):
+    """mvhd payload, version 1 (64-bit times and duration)."""
+    return struct.pack(">B3xQQIQ", 1, 0, 0, timescale, duration) + bytes(80)
+
+
+def write_mp4(name, data):
+    path = TEST_CONTENT_DIR / name
+    path.write_bytes(data)
+    return path
+
+
+def cleanup_test_data():
+    """Clean up test data."""
+    try:
+        shutil.rmtree(TEST_DIR)
+    except Exception as e:
+        print(f"Warning: Could not clean up test directory: {e}")
+
+
+def test_1_mvhd_version_0():
+    """Test 1: Version 0 mvhd after mdat (faststart off)."""
+    print("\n=== Test 1: mvhd version 0 ===")
+
+    data = (mp4_box(b"ftyp", b"isom\0\0\0\0")
+            + mp4_box(b"mdat", bytes(4096))
+            + mp4_box(b"moov", mp4_box(b"mvhd", mvhd_v0(1000, 1_234_500))))
+    duration = metadata_daemon.read_mp4_duration(write_mp4("v0.mp4", data))
+    assert duration == 1234.5, f"Expected 1234.5, got {duration}"
+    print(f"  Duration {duration}s ✓")
+
+    print("  Test 1 PASSED")
+    return True
+
+
+def test_2_mvhd_version_1():
+    """Test 2: Version 1 mvhd with a 64-bit duration, behind a largesize mdat."""
+    print("\n=== Test 2: mvhd version 1 ===")
+
+    mdat_payload = bytes(1024)
+    large_mdat = struct.pack(">I4sQ", 1, b"mdat", 16 + len(mdat_payload)) + mdat_payload
+    data = (mp4_box(b"ftyp", b"isom\0\0\0\0")
+            + large_mdat
+            + mp4_box(b"moov", mp4_box(b"mvhd", mvhd_v1(10_000_000, 60_000_000_000))))
+    duration = metadata_daemon.read_mp4_duration(write_mp4("v1.mp4", data))
+    assert duration == 6000.0, f"Expected 6000.0, got {duration}"
+    print(f"  Duration {duration}s (64-bit duration field) ✓")
+
+    print("  Test 2 PASSED")
+    return True
+
+
+def test_3_missing_moov():
+    """Test 3: Files without a moov box fall back to ffprobe (None)."""
+    print("\n=== Test 3: Missing moov ===")
+
+    data = mp4_box(b"ftyp", b"isom\0\0\0\0") + mp4_box(b"mdat", bytes(256))
+    assert metadata_daemon.read_mp4_duration(write_mp4("no_moov.mp4", data)) is None
+    print(f"  No moov: None ✓")
+
+    unknown = mp4_box(b"moov", mp4_box(b"mvhd", mvhd_v0(1000, 0xFFFFFFFF)))
+    assert metadata_daemon.read_mp4_duration(write_mp4("fragmented.mp4", unknown)) is None
+    print(f"  Unknown (all-ones) duration: None ✓")
+
+    print("  Test 3 PASSED")
+    return True
+
+
+def test_4_truncated_boxes():
+    """Test 4: Truncated or malformed boxes return None instead of raising."""
+    print("\n=== Test 4: Truncated boxes ===")
+
+    full = mp4_box(b"moov", mp4_box(b"mvhd", mvhd_v0(1000, 5000)))
+    cut = mp4_box(b"ftyp", b"isom\0\0\0\0") + full[:20]
+    assert metadata_daemon.read_mp4_duration(write_mp4("truncated.mp4", cut)) is None
+    print(f"  mvhd cut mid-payload: None ✓")
+
+    bad_size = struct.pack(">I4s", 4, b"ftyp") + bytes(16)
+    assert metadata_daemon.read_mp4_duration(write_mp4("bad_size.mp4", bad_size)) is None
+    print(f"  Box size smaller than its header: None ✓")
+
+    assert metadata_daemon.read_mp4_duration(write_mp4("empty.mp4", b"")) is None
+    assert metadata_daemon.read_mp4_duration(TEST_CONTENT_DIR / "missing.mp4") is None
+    print(f"  Empty and missing files: None ✓")
+
+    print("  Test 4 PASSED")
+    return True
+
+
+def test_5_journal_replay_after_crash():
+    """Test 5: Results journaled by a crashed run are merged on the next start."""
+    print("\n=== Test 5: Journal replay after crash ===")
+
+    metadata_daemon.METADATA_FILE.write_text(json.dumps({
+        "video_a": {"title": "A"},
+        "video_b": {"title": "B"},
+    }))
+
+    # A child process journals two results and dies before flushing
+    crash_script = (
+        "import os, sys, pathlib\n"
+        "import metadata_daemon\n"
+        "metadata_daemon.RESULTS_JOURNAL_FILE = pathlib.Path(sys.argv[1])\n"
+        "conn = metadata_daemon.open_results_journal()\n"
+        "metadata_daemon.journal_record(conn, 'video_a', {'duracion': 120.0})\n"
+        "metadata_daemon.journal_record(conn, 'video_b', {'loudness_lufs': -23.0})\n"
+        "os._exit(1)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", crash_script, str(metadata_daemon.RESULTS_JOURNAL_FILE)],
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 1, "Crash script should exit without cleanup"
+    metadata = json.loads(metadata_daemon.METADATA_FILE.read_text())
+    assert "duracion" not in metadata["video_a"], "Results reached metadata.json before recovery"
+    print(f"  Crashed run left results only in the journal ✓")
+
+    metadata_daemon.recover_journaled_updates()
+
+    metadata = json.loads(metadata_daemon.METADATA_FILE.read_text())
+    assert metadata["video_a"] == {"title": "A", "duracion": 120.0}
+    assert metadata["video_b"] == {"title": "B", "loudness_lufs": -23.0}
+    print(f"  Recovery merged journaled fields into metadata.json ✓")
+
+    conn = metadata_daemon.open_results_journal()
+    try:
+        assert metadata_daemon.journal_pending(conn) == {}, "Journal should be empty after flush"
+    finally:
+        conn.close()
+    print(f"  Journal cleared after flush ✓")
+
+    print("  Test 5 PASSED")
+    return True
+
+
+def test_6_loudness_split_into_passes():
+    """Test 6: Long files are measured in passes of a few windows each."""
+    print("\n=== Test 6: Loudness passes ===")
+
+    windows = metadata_daemon.loudness_sample_windows(7200)
+    assert len(windows) == 24, f"Expected 24 windows for 2h, got {len(windows)}"
+    assert windows[1] == (300, 330)
+    print(f"  2h film sampled 30s every 5 min ({len(windows)} windows) ✓")
+
+    commands = []
+
+    def fake_run_throttled(cmd, timeout=600):
+        commands.append(cmd)
+        return "", "[Parsed_ebur128_0] Summary:\n    I:         -23.0 LUFS\n", True
+
+    original = metadata_daemon.run_throttled
+    metadata_daemon.run_throttled = fake_run_throttled
+    try:
+        lufs = metadata_daemon.analyze_loudness("film.mp4", duration=7200)
+    finally:
+        metadata_daemon.run_throttled = original
+
+    per_pass = metadata_daemon.LOUDNESS_WINDOWS_PER_PASS
+    assert len(commands) == 4, f"Expected 4 passes, got {len(commands)}"
+    assert all(cmd.count("-i") <= per_pass for cmd in commands)
+    assert sum(cmd.count("-i") for cmd in commands) == len(windows)
+    assert lufs == -23.0, f"Expected -23.0, got {lufs}"
+    print(f"  {len(windows)} windows in {len(commands)} runs of at most {per_pass} inputs ✓")
+
+    combine = metadata_daemon.combine_integrated_loudness
+    assert abs(combine([(-20.0, 180), (-30.0, 180)]) - -22.6) < 0.05
+    assert combine([(-20.0, 180), (-70.0, 30)]) == -20.0
+    print(f"  Passes combined by energy, silent passes gated ✓")
+
+    print("  Test 6 PASSED")
+    return True
+
+
+def test_7_loudness_waits_for_duration_probe():
+    """Test 7: A new video's loudness run waits for Phase 1's duration."""
+    print("\n=== Test 7: Loudness waits for the duration probe ===")
+
+    metadata_daemon.THUMB_DIR = TEST_CONTENT_DIR / "thumbnails"
+    metadata_daemon.METADATA_FILE.write_text(json.dumps({
+        "new_video": {"title": "New"},
+        "known_video": {"title": "Known", "duracion": 600.0},
+    }))
+    metadata_daemon._work_cache.clear()
+
+    calls = []
+
+    def fake_process_one_video(video_id, info, missing_fields):
+        calls.append((video_id, info.get("duracion"), tuple(missing_fields)))
+        if "duracion" in missing_fields:
+            return {"duracion": 1800.0}
+        if "loudness_lufs" in missing_fields:
+            return {"loudness_lufs": -23.0}
+        return {}
+
+    original = metadata_daemon.process_one_video
+    metadata_daemon.process_one_video = fake_process_one_video
+    try:
+        processed = metadata_daemon.run_phases([
+            ("Phase 1", metadata_daemon.find_videos_needing_fast_metadata, 2),
+            ("Phase 2", metadata_daemon.find_videos_needing_loudness, 1),
+        ])
+    finally:
+        metadata_daemon.process_one_video = original
+
+    assert processed == {"Phase 1": 2, "Phase 2": 2}, f"Unexpected counts: {processed}"
+    new_calls = [call for call in calls if call[0] == "new_video"]
+    assert new_calls[0][2] == ("duracion", "thumbnail"), "Duration probe should run first"
+    assert new_calls[1] == ("new_video", 1800.0, ("loudness_lufs",)), \
+        f"Loudness should get the probed duration, got {new_calls[1]}"
+    print(f"  Loudness queued after the probe, with its duration ✓")
+
+    metadata = json.loads(metadata_daemon.METADATA_FILE.read_text())
+    assert metadata["new_video"]["duracion"] == 1800.0
+    assert metadata["new_video"]["loudness_lufs"] == -23.0
+    assert metadata["known_video"]["loudness_lufs"] == -23.0
+    print(f"  Both phases' results flushed to metadata.json ✓")
+
+    print("  Test 7 PASSED")
+    return True
+
+
+def test_8_idle_wait_wakes_on_library_change():
+    """Test 8: The idle wait sleeps until the library changes, not on a poll."""
+    print("\n=== Test 8: Idle wait wakes on library changes ===")
+
+    metadata_daemon.SERIES_VIDEO_DIR = TEST_CONTENT_DIR / "videos" / "series"
+    metadata_daemon.COMMERCIALS_DIR = TEST_CONTENT_DIR / "videos" / "commercials"
+    (metadata_daemon.SERIES_VIDEO_DIR / "show").mkdir(parents=True, exist_ok=True)
+    metadata_daemon.COMMERCIALS_DIR.mkdir(parents=True, exist_ok=True)
+    metadata_daemon._last_scan_signature = metadata_daemon.get_scan_signature()
+
+    def later(action):
+        timer = threading.Timer(0.2, action)
+        timer.start()
+        return timer
+
+    later(lambda: (TEST_CONTENT_DIR / "unrelated.txt").write_text("x"))
+    start = time.monotonic()
+    assert not metadata_daemon.wait_for_changes(0.6), "Unrelated files shouldn't wake the daemon"
+    assert time.monotonic() - start >= 0.6
+    print(f"  Unrelated writes in content/ are ignored ✓")
+
+    later(lambda: (metadata_daemon.SERIES_VIDEO_DIR / "show" / "show_s01e01.mp4").write_bytes(b""))
+    start = time.monotonic()
+    assert metadata_daemon.wait_for_changes(5), "A new episode should wake the daemon"
+    assert time.monotonic() - start < 2, "Wake-up should follow the change, not the timeout"
+    print(f"  New episode file wakes the wait ✓")
+
+    metadata_daemon._last_scan_signature = metadata_daemon.get_scan_signature()
+    later(lambda: metadata_daemon.write_metadata_locked({}))
+    assert metadata_daemon.wait_for_changes(5), "Replacing metadata.json should wake the daemon"
+    print(f"  Atomic metadata.json replace wakes the wait ✓")
+
+    (metadata_daemon.COMMERCIALS_DIR / "ad.mp4").write_bytes(b"")
+    assert metadata_daemon.wait_for_changes(5), "Changes since the last scan should return at once"
+    print(f"  Changes made before the watch started are caught ✓")
+
+    print("  Test 8 PASSED")
+    return True
+
+
+def run_all_tests():
+    """Run all test cases."""
+    print("=" * 60)
+    print("METADATA DAEMON TESTS")
+    print("=" * 60)
+
+    tests = [
+        test_1_mvhd_version_0,
+        test_2_mvhd_version_1,
+        test_3_missing_moov,
+        test_4_truncated_boxes,
+        test_5_journal_replay_after_crash,
+        test_6_loudness_split_into_passes,
+        test_7_loudness_waits_for_duration_probe,
+        test_8_idle_wait_wakes_on_library_change,
+    ]
+
+    passed = 0
+    failed = 0
+    failures = []
+
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            failed += 1
+            failures.append((test.__name__, str(e)))
+            print(f"  Test FAILED: {e}")
+        except Exception as e:
+            failed += 1
+            failures.append((test.__name__, str(e)))
+            print(f"  Test ERROR: {type(e).__name__}: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"RESULTS: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    if failures:
+        print("\nFAILURES:")
+        for name, error in failures:
+            print(f"  - {name}: {error}")
+
+    cleanup_test_data()
+
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
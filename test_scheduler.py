@@ -48,7 +48,8 @@ scheduler.DAILY_SCHEDULE_FILE = TEST_CONTENT_DIR / "daily_schedule.json"
 scheduler.EPISODE_CURSORS_FILE = TEST_CONTENT_DIR / "episode_cursors.json"
 scheduler.SCHEDULE_META_FILE = TEST_CONTENT_DIR / "schedule_meta.json"
 scheduler.SYSTEM_VIDEO_DIR = TEST_VIDEO_DIR / "system"
-scheduler.TEST_PATTERN_VIDEO = scheduler.SYSTEM_VIDEO_DIR / "test_pattern.mp4"
+scheduler.TEST_PATTERN_VIDEO = scheduler.SYSTEM_VIDEO_DIR / "test_pattern_loop.mp4"
+scheduler.LEGACY_TEST_PATTERN_VIDEO = scheduler.SYSTEM_VIDEO_DIR / "test_pattern.mp4"
 scheduler.SPONSORS_PLACEHOLDER_VIDEO = scheduler.SYSTEM_VIDEO_DIR / "sponsors_placeholder.mp4"
 
 
@@ -402,6 +403,13 @@ def test_8_eligible_series_for_time():
     assert len(eligible) == 1, f"Expected only 1 series, got {len(eligible)}"
     print(f"  Early morning: {eligible} ✓")
 
+    # One-pass grouping agrees with the per-period lookup
+    buckets = scheduler.group_series_by_time_of_day(channel_series, series_data)
+    for time_of_day in scheduler.TIME_OF_DAY_RANGES:
+        expected = scheduler.get_eligible_series_for_time(time_of_day, channel_series, series_data)
+        assert buckets[time_of_day] == expected, f"{time_of_day}: {buckets[time_of_day]} != {expected}"
+    print(f"  Grouped buckets match per-period eligibility ✓")
+
     print("  Test 8 PASSED")
     return True
 
@@ -463,7 +471,7 @@ def test_10_daily_schedule_generation():
     # Mock the system video generation (skip actual ffmpeg calls)
     scheduler.SYSTEM_VIDEO_DIR.mkdir(parents=True, exist_ok=True)
     # Create dummy video files
-    (scheduler.SYSTEM_VIDEO_DIR / "test_pattern.mp4").touch()
+    (scheduler.SYSTEM_VIDEO_DIR / "test_pattern_loop.mp4").touch()
     (scheduler.SYSTEM_VIDEO_DIR / "sponsors_placeholder.mp4").touch()
 
     # Generate daily schedule
@@ -643,6 +651,9 @@ def test_14_generate_block_schedule():
         assert "base_timestamp" in ep, "Episode missing base_timestamp"
     print(f"  Episode entries have base_timestamp ✓")
 
+    assert abs(entries[-1]["end"] - 1800) < 1e-6, f"Block should end at 1800, got {entries[-1]['end']}"
+    print(f"  Last break fills the block exactly ✓")
+
     print("  Test 14 PASSED")
     return True
 
@@ -722,6 +733,15 @@ def test_16_schedule_regeneration_checks():
         assert result == False, "Should not need weekly regeneration on non-Sunday"
         print(f"  Non-Sunday: needs_weekly_regeneration = {result} ✓")
 
+    # Epoch timestamps (current format) agree with the legacy ISO strings
+    today_4am = now.replace(hour=4, minute=0, second=0, microsecond=0)
+    for generated in (today_4am, today_4am - timedelta(days=1)):
+        legacy = scheduler.needs_daily_regeneration({"daily_generated": generated.isoformat()}, today_4am)
+        epoch = scheduler.needs_daily_regeneration(
+            {"daily_generated_epoch": int(generated.timestamp())}, today_4am)
+        assert legacy == epoch, f"Epoch and ISO meta disagree for {generated}"
+    print(f"  Epoch meta matches legacy ISO meta ✓")
+
     print("  Test 16 PASSED")
     return True
 
@@ -901,7 +921,7 @@ def test_22_video_url_construction():
     test_time = datetime.now().replace(hour=3, minute=30, second=0, microsecond=0)
     result = scheduler.get_scheduled_content("channel_1", test_time)
 
-    assert result["video_url"] == "/videos/system/test_pattern.mp4", \
+    assert result["video_url"] == "/videos/system/test_pattern_loop.mp4", \
         f"Test pattern URL wrong: {result['video_url']}"
     print(f"  Test pattern URL: {result['video_url']} ✓")
 
@@ -1025,13 +1045,22 @@ def test_25_seek_to_calculation_accuracy():
     print(f"  5:00:00am: type={result1['type']}, seek_to={result1['seek_to']}")
     print(f"  5:00:30am: type={result2['type']}, seek_to={result2['seek_to']}")
 
-    # If same video, seek should differ by ~30 seconds
-    if result1["video_id"] == result2["video_id"]:
+    # If same video, seek should differ by ~30 seconds (modulo the clip
+    # length for the looping test pattern)
+    if result1["type"] == "test_pattern" and result2["type"] == "test_pattern":
+        expected_diff = 30 % scheduler.TEST_PATTERN_LOOP_SEC
+        seek_diff = (result2["seek_to"] - result1["seek_to"]) % scheduler.TEST_PATTERN_LOOP_SEC
+        assert seek_diff == expected_diff, f"Test pattern seek should wrap, got {seek_diff}s"
+        print(f"  Test pattern: seek wraps with the loop ✓")
+    elif (scheduler.get_slot_at("channel_1", scheduler.seconds_since_schedule_start(base_time))
+          is scheduler.get_slot_at("channel_1", scheduler.seconds_since_schedule_start(later_time))):
+        # Same schedule entry (a short commercial may also repeat back-to-back,
+        # which is a different entry of the same video)
         seek_diff = result2["seek_to"] - result1["seek_to"]
         assert abs(seek_diff - 30) < 2, f"Seek difference should be ~30s, got {seek_diff}s"
-        print(f"  Same video: seek differs by {seek_diff}s ✓")
+        print(f"  Same entry: seek differs by {seek_diff}s ✓")
     else:
-        print(f"  Different videos - seek calculation still valid ✓")
+        print(f"  Different entries - seek calculation still valid ✓")
 
     # Test at the edge of test pattern period
     test_start = datetime.now().replace(hour=3, minute=0, second=0, microsecond=0)
@@ -1041,7 +1070,9 @@ def test_25_seek_to_calculation_accuracy():
 
     test_mid = datetime.now().replace(hour=3, minute=30, second=0, microsecond=0)
     result_mid = scheduler.get_scheduled_content("channel_1", test_mid)
-    assert result_mid["seek_to"] == 1800, f"3:30am should have seek_to=1800, got {result_mid['seek_to']}"
+    expected_mid = 1800 % scheduler.TEST_PATTERN_LOOP_SEC
+    assert result_mid["seek_to"] == expected_mid, \
+        f"3:30am should have seek_to={expected_mid} (looping clip), got {result_mid['seek_to']}"
     print(f"  3:30:00am (mid test pattern): seek_to={result_mid['seek_to']} ✓")
 
     print("  Test 25 PASSED")
@@ -1292,6 +1323,241 @@ def test_31_detection_cache_and_rematch():
     return True
 
 
+def test_32_schedule_index_matches_linear_scan():
+    """Test 32: Bisect lookup index agrees with a first-match linear scan."""
+    print("\n=== Test 32: Schedule lookup index ===")
+
+    scheduler.generate_weekly_schedule()
+    scheduler.generate_daily_schedule()
+
+    schedule = scheduler.load_daily_schedule()
+    channel_entries = schedule["channels"]["channel_1"]
+
+    def linear_lookup(second):
+        for entry in channel_entries:
+            if entry["start"] <= second < entry["end"]:
+                return entry
+        return None
+
+    base = datetime.now().replace(hour=3, minute=0, second=0, microsecond=0)
+    mismatches = 0
+    for second in range(0, 24 * 3600, 97):
+        ts = base + timedelta(seconds=second)
+        result = scheduler.get_scheduled_content("channel_1", ts)
+        expected = linear_lookup(second)
+        if expected is None:
+            ok = result["type"] == "test_pattern"
+        else:
+            expected_seek = expected.get("base_timestamp", 0) + second - expected["start"]
+            if expected["type"] == "test_pattern":
+                expected_seek %= scheduler.TEST_PATTERN_LOOP_SEC
+            ok = (result["video_id"] == expected["video_id"]
+                  and result["seek_to"] == expected_seek)
+        if not ok:
+            mismatches += 1
+    assert mismatches == 0, f"{mismatches} lookups disagree with linear scan"
+    print(f"  Indexed lookup matches linear scan across the day ✓")
+
+    # Overlapping entries: the earlier entry keeps the shared range
+    overlapping = {"channels": {"c": [
+        {"start": 0, "end": 100, "type": "episode", "video_id": "first"},
+        {"start": 50, "end": 80, "type": "episode", "video_id": "shadowed"},
+        {"start": 90, "end": 150, "type": "episode", "video_id": "tail"},
+    ]}}
+    starts, entries = scheduler._build_schedule_index(overlapping)["c"]
+    assert [e.video_id for e in entries] == ["first", "tail"], entries
+    assert list(starts) == [0, 100], starts
+    print(f"  Overlapping entries resolved first-match ✓")
+
+    print("  Test 32 PASSED")
+    return True
+
+
+def test_33_channel_regeneration_leaves_cached_schedule_intact():
+    """Test 33: Per-channel daily regeneration swaps in a new schedule dict."""
+    print("\n=== Test 33: Per-channel regeneration copy-on-write ===")
+
+    scheduler.generate_weekly_schedule()
+    scheduler.generate_daily_schedule()
+
+    before = scheduler.load_daily_schedule()
+    before_channels = before["channels"]
+    before_entries = before_channels["channel_1"]
+    before_generated = before["generated_at"]
+    other_index = scheduler._daily_schedule_index["channel_2"]
+
+    after = scheduler.generate_daily_schedule(channel_id="channel_1")
+
+    assert after is not before, "Regeneration should build a new schedule dict"
+    assert before["channels"] is before_channels
+    assert before["channels"]["channel_1"] is before_entries, "Old schedule was mutated"
+    assert before["generated_at"] == before_generated
+    print(f"  Previously cached schedule not mutated ✓")
+
+    assert scheduler.load_daily_schedule() is after
+    assert set(after["channels"]) == set(before_channels)
+    print(f"  New schedule swapped into cache with all channels ✓")
+
+    assert scheduler._daily_schedule_index["channel_2"] is other_index, "Untouched channel was re-indexed"
+    assert scheduler.get_slot_at("channel_1", 3600 + 60) is not None
+    print(f"  Only the regenerated channel is re-indexed ✓")
+
+    print("  Test 33 PASSED")
+    return True
+
+
+def test_34_json_loads_reuse_unchanged_files():
+    """Test 34: load_* helpers reuse the parse until the file changes."""
+    print("\n=== Test 34: Cached JSON loads ===")
+
+    first = scheduler.load_series()
+    assert scheduler.load_series() is first, "Unchanged series.json should not be re-parsed"
+    print(f"  Unchanged file served from cache ✓")
+
+    series_name = next(iter(first))
+    original = first[series_name].get("time_of_day", "any")
+    new_value = next(value for value in sorted(scheduler.VALID_TIME_OF_DAY) if value != original)
+    try:
+        assert scheduler.set_series_time_of_day(series_name, new_value)
+        assert first[series_name].get("time_of_day", "any") == original, "Cached dict was mutated"
+        assert scheduler.get_series_time_of_day(series_name) == new_value
+        print(f"  Save invalidates the cache without touching the old dict ✓")
+
+        cursors = scheduler.load_episode_cursors()
+        cursors.setdefault("channel_1", {})["scratch"] = {"last_index": 0}
+        assert "scratch" not in scheduler.load_episode_cursors().get("channel_1", {})
+        print(f"  Cursor edits stay local until saved ✓")
+    finally:
+        scheduler.set_series_time_of_day(series_name, original)
+
+    print("  Test 34 PASSED")
+    return True
+
+
+def test_35_scheduler_sleeps_until_generation_time():
+    """Test 35: Background loop sleeps until the next generation time."""
+    print("\n=== Test 35: Scheduler wake alignment ===")
+
+    saturday = datetime(2026, 10, 17, 2, 59, 30)  # 30s before the daily run
+    assert scheduler.seconds_until_next_check(saturday) == 30
+    print(f"  Wakes at 3:00am for the daily schedule ✓")
+
+    sunday = datetime(2026, 10, 18, 2, 29, 50)  # 10s before the weekly run
+    assert scheduler.seconds_until_next_check(sunday) == 10
+    print(f"  Wakes at Sunday 2:30am for the weekly schedule ✓")
+
+    midday = datetime(2026, 10, 17, 12, 0, 0)
+    assert scheduler.seconds_until_next_check(midday) == scheduler.SCHEDULER_CHECK_INTERVAL
+    assert scheduler.seconds_until_next_check(datetime(2026, 10, 17, 3, 0, 0)) >= 1
+    print(f"  Sleep capped at {scheduler.SCHEDULER_CHECK_INTERVAL}s between boundaries ✓")
+
+    if not scheduler.DAILY_SCHEDULE_FILE.exists():
+        scheduler.generate_weekly_schedule()
+        scheduler.generate_daily_schedule()
+    after_midnight = {"daily_generated": datetime(2026, 10, 17, 1, 0).isoformat()}
+    assert not scheduler.needs_daily_regeneration(after_midnight, datetime(2026, 10, 17, 2, 30))
+    assert scheduler.needs_daily_regeneration(after_midnight, datetime(2026, 10, 17, 3, 0))
+    saturday_gen = {"weekly_generated_epoch": int(datetime(2026, 10, 17, 12, 0).timestamp())}
+    assert not scheduler.needs_weekly_regeneration(saturday_gen, datetime(2026, 10, 18, 2, 29))
+    assert scheduler.needs_weekly_regeneration(saturday_gen, datetime(2026, 10, 18, 2, 30))
+    print(f"  Regeneration is due at the first boundary after the last run ✓")
+
+    scheduler.wake_scheduler()
+    assert scheduler._scheduler_wake.is_set(), "wake_scheduler() should cut the sleep short"
+    scheduler._scheduler_wake.clear()
+    print(f"  wake_scheduler() interrupts the sleep ✓")
+
+    now = scheduler.app_now()
+    scheduler.check_and_generate_schedules(now)  # nothing due after this
+    before = scheduler.load_schedule_meta()
+    scheduler.wake_scheduler(daily=True)
+    scheduler._scheduler_wake.clear()
+    later = now + timedelta(seconds=1)
+    scheduler.check_and_generate_schedules(later)
+    meta = scheduler.load_schedule_meta()
+    assert meta["daily_generated_epoch"] == int(later.timestamp()), "Forced daily rebuild should run"
+    assert meta.get("weekly_generated_epoch") == before.get("weekly_generated_epoch"), \
+        "Weekly schedule should not be rebuilt for a daily wake"
+    print(f"  wake_scheduler(daily=True) forces a daily rebuild ✓")
+
+    print("  Test 35 PASSED")
+    return True
+
+
+def test_36_advance_episodes_matches_single_steps():
+    """Test 36: advancing several episodes at once matches repeated single advances."""
+    print("\n=== Test 36: Batched cursor advance ===")
+
+    episodes = [{"video_id": f"ep{i}", "season": 1, "episode": i + 1} for i in range(3)]
+
+    batched = {"channel_1": {"show": {"last_index": 1}}}
+    stepped = {"channel_1": {"show": {"last_index": 1}}}
+
+    picked = scheduler.advance_episodes_for_channel("channel_1", "show", 3, batched, episodes)
+    single = [scheduler.get_next_episode_for_channel("channel_1", "show", stepped, episodes=episodes)
+              for _ in range(3)]
+
+    assert [ep["video_id"] for ep in picked] == ["ep2", "ep0", "ep1"], "Batch should wrap around"
+    assert picked == single, "Batch and single advances disagree"
+    assert batched["channel_1"]["show"]["last_index"] == stepped["channel_1"]["show"]["last_index"] == 1
+    print(f"  Wrap-around and final cursor match ✓")
+
+    fresh = {}
+    assert scheduler.advance_episodes_for_channel("channel_2", "show", 1, fresh, episodes)[0]["video_id"] == "ep0"
+    assert fresh["channel_2"]["show"]["episode"] == 1
+    print(f"  Missing cursor starts at the first episode ✓")
+
+    series_name, series_episodes = next(
+        (name, eps) for name, eps in scheduler.get_episodes_by_series().items() if len(eps) > 1)
+    before = scheduler.load_episode_cursors()
+    with scheduler.cursor_batch() as cursors:
+        for _ in range(2):
+            scheduler.get_next_episode_for_channel("channel_1", series_name, cursors,
+                                                   episodes=series_episodes)
+        assert scheduler.load_episode_cursors() == before, "Batch saved before exit"
+    expected = (before.get("channel_1", {}).get(series_name, {}).get("last_index", -1) + 2) % len(series_episodes)
+    assert scheduler.load_episode_cursors()["channel_1"][series_name]["last_index"] == expected
+    scheduler.save_episode_cursors(before)
+    print(f"  cursor_batch() saves once on exit ✓")
+
+    print("  Test 36 PASSED")
+    return True
+
+
+def test_37_long_episodes_own_their_blocks():
+    """Test 37: multi-block episodes are not overwritten by the following blocks."""
+    print("\n=== Test 37: Multi-block ownership ===")
+
+    scheduler.generate_weekly_schedule()
+    schedule = scheduler.generate_daily_schedule()
+
+    for cid, entries in schedule["channels"].items():
+        for prev, entry in zip(entries, entries[1:]):
+            assert entry["start"] >= prev["end"] - 1e-6, \
+                f"{cid}: entry at {entry['start']} overlaps one ending at {prev['end']}"
+        print(f"  {cid}: {len(entries)} entries, no overlaps ✓")
+
+    print("  Test 37 PASSED")
+    return True
+
+
+def test_38_forced_weekly_rebuild_changes_lineup():
+    """Test 38: rebuilding one channel's weekly schedule gives a new lineup."""
+    print("\n=== Test 38: Forced weekly rebuild ===")
+
+    now = datetime(2026, 10, 14, 12, 0)
+    scheduler.generate_weekly_schedule(now=now)
+    original = scheduler.load_weekly_schedule()["channels"]["channel_1"]
+
+    rebuilt = [scheduler.generate_weekly_schedule(channel_id="channel_1", now=now)["channels"]["channel_1"]
+               for _ in range(5)]
+    assert any(lineup != original for lineup in rebuilt), "Rebuild reproduced the same lineup"
+    print(f"  Rebuild within the same week changes the lineup ✓")
+
+    print("  Test 38 PASSED")
+    return True
+
+
 def run_all_tests():
     """Run all tests."""
     print("=" * 60)
@@ -1332,6 +1598,13 @@ def run_all_tests():
         test_29_manual_channels_override_detected,
         test_30_channel_detection_matching,
         test_31_detection_cache_and_rematch,
+        test_32_schedule_index_matches_linear_scan,
+        test_33_channel_regeneration_leaves_cached_schedule_intact,
+        test_34_json_loads_reuse_unchanged_files,
+        test_35_scheduler_sleeps_until_generation_time,
+        test_36_advance_episodes_matches_single_steps,
+        test_37_long_episodes_own_their_blocks,
+        test_38_forced_weekly_rebuild_changes_lineup,
     ]
 
     passed = 0